@@ -366,6 +366,25 @@ class ContextBuilder:
         )
         return messages
 
+    def add_tool_results(
+        self, messages: list[dict[str, Any]], results: list[tuple[str, str, str]]
+    ) -> list[dict[str, Any]]:
+        """
+        Add a batch of tool results to the message list in one extend.
+
+        Args:
+            messages: Current message list.
+            results: (tool_call_id, tool_name, result) tuples in call order.
+
+        Returns:
+            Updated message list.
+        """
+        messages.extend(
+            {"role": "tool", "tool_call_id": tool_call_id, "name": tool_name, "content": result}
+            for tool_call_id, tool_name, result in results
+        )
+        return messages
+
     def add_assistant_message(
         self,
         messages: list[dict[str, Any]],
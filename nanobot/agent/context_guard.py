@@ -106,6 +106,28 @@ class ContextGuard:
         else:
             self.limit = self.DEFAULT_LIMIT
 
+    def may_need_compaction(self, messages: List[Dict[str, Any]]) -> bool:
+        """
+        Cheap upper-bound check before running the real token count.
+        A token never spans less than one UTF-8 byte, so if the byte total stays
+        under the compaction threshold, evaluate() cannot ask for compaction.
+        """
+        if not TokenCounter.get_encoding():
+            # The char-based fallback estimate is already cheap; defer to evaluate().
+            return True
+        budget = self.limit * self.THRESHOLD
+        upper = 2
+        for message in messages:
+            upper += 4
+            for value in message.values():
+                if isinstance(value, str):
+                    upper += len(value.encode("utf-8"))
+                elif isinstance(value, list):
+                    upper += len(json.dumps(value).encode("utf-8"))
+            if upper > budget:
+                return True
+        return False
+
     def evaluate(self, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Check if messages fit within the limit.
@@ -9,6 +9,7 @@ from nanobot.agent.failure_types import FailureEvent, FailureSeverity
 from nanobot.agent.incident_manager import IncidentManager
 from nanobot.agent.loop_guard import tool_call_hash
 from nanobot.agent.tools.base import Tool, ToolResult
+from nanobot.hooks import trigger_registry_hook
 
 
 class ToolRegistryProtocol(Protocol):
@@ -231,12 +232,7 @@ class ToolExecutor:
             logger.debug(f"IncidentManager.report ignored error: {e}")
 
     async def _trigger_hook(self, event: str, payload: Dict[str, Any]) -> None:
-        if self.hook_registry is None:
-            return
-        trigger = getattr(self.hook_registry, "trigger_hook", None)
-        if not callable(trigger):
-            return
-        await trigger(event, payload)
+        await trigger_registry_hook(self.hook_registry, event, payload)
 
     def _refine_error(self, name: str, params: Dict[str, Any], raw_error: str) -> str:
         """Transform technical errors into AI-actionable instructions."""
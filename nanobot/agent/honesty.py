@@ -1,16 +1,27 @@
 import re
+from collections.abc import Collection
 from typing import Any
 
-def audit_and_mark_hallucinations(
-    content: str, used_tools: list[str], all_tools_meta: list[dict[str, Any]]
-) -> tuple[str, bool]:
+_CLAIM_MARKERS = ("我用", "使用了", "调用了", "测试了", "刚才", "本次", "通过")
+_CJK_NAME_RE = re.compile(r"[\u4e00-\u9fff]{2,}")
+_GENERIC_CJK_WORDS = frozenset(("工具", "封装", "插件", "使用", "能力", "查看"))
+# Specific well-known aliases for core tools
+_CORE_ALIAS_OVERRIDES = {
+    "browser": ("浏览器", "网页", "上网"),
+    "tavily": ("搜索", "联网", "Tavily"),
+    "github": ("GitHub", "仓库", "代码仓"),
+    "train_ticket": ("12306", "火车票", "买票"),
+}
+
+def unexecuted_tool_aliases(
+    used_tools: Collection[str], all_tools_meta: list[dict[str, Any]]
+) -> list[tuple[str, tuple[str, ...]]]:
     """
-    Detect and mark tool execution hallucinations using strikethroughs.
-    Returns (processed_content, hallucination_detected_boolean).
-    Shared by UserTurnService and SystemTurnService.
+    Build (tool_name, aliases) pairs for tools that were NOT executed this turn.
+    Only these can be the subject of a hallucinated execution claim.
     """
-    used = set(used_tools or [])
-    hallucination_detected = False
+    # Callers on the hot path pass a frozenset already; avoid copying it.
+    used = used_tools if isinstance(used_tools, (set, frozenset)) else frozenset(used_tools or ())
 
     # Build dynamic tool alias map
     # e.g., "amap" -> ["amap", "高德", "地图"]
@@ -20,44 +31,66 @@ def audit_and_mark_hallucinations(
         desc = str(meta.get("description", ""))
         aliases = {name.lower()}
         # Extract common business names from description (CJK only)
-        cjk_names = re.findall(r"[\u4e00-\u9fff]{2,}", desc)
+        cjk_names = _CJK_NAME_RE.findall(desc)
         for cjk in cjk_names:
-            if cjk not in ("工具", "封装", "插件", "使用", "能力", "查看"):
+            if cjk not in _GENERIC_CJK_WORDS:
                 aliases.add(cjk)
         tool_alias_map[name] = aliases
 
-    # Specific well-known aliases for core tools
-    core_overrides = {
-        "browser": {"浏览器", "网页", "上网"},
-        "tavily": {"搜索", "联网", "Tavily"},
-        "github": {"GitHub", "仓库", "代码仓"},
-        "train_ticket": {"12306", "火车票", "买票"},
-    }
-    for k, v in core_overrides.items():
+    for k, v in _CORE_ALIAS_OVERRIDES.items():
         if k in tool_alias_map:
             tool_alias_map[k].update(v)
 
-    claim_markers = ("我用", "使用了", "调用了", "测试了", "刚才", "本次", "通过")
-    lines = content.splitlines()
-    processed_lines: list[str] = []
+    return [
+        (tool_name, tuple(aliases))
+        for tool_name, aliases in tool_alias_map.items()
+        if tool_name not in used and f"mcp:{tool_name}" not in used
+    ]
 
-    for line in lines:
-        should_mark = False
-        found_tool_name = ""
 
-        for tool_name, aliases in tool_alias_map.items():
-            if tool_name in used or f"mcp:{tool_name}" in used:
-                continue
+def narrow_to_content(
+    content: str, unused_aliases: list[tuple[str, tuple[str, ...]]]
+) -> list[tuple[str, tuple[str, ...]]]:
+    """
+    Keep only the tools whose aliases occur somewhere in `content`, or none at all
+    if it has no claim marker. A few whole-string scans replace per-line work on clean replies.
+    """
+    if not unused_aliases or not any(m in content for m in _CLAIM_MARKERS):
+        return []
+    return [(name, aliases) for name, aliases in unused_aliases if any(a in content for a in aliases)]
 
-            if any(a in line for a in aliases) and any(m in line for m in claim_markers):
-                should_mark = True
-                found_tool_name = tool_name
-                break
 
-        if should_mark:
-            hallucination_detected = True
+def mark_unexecuted_claim(line: str, unused_aliases: list[tuple[str, tuple[str, ...]]]) -> str | None:
+    """Return the struck-through line if it claims an unexecuted tool, else None."""
+    # Claim markers are rare, so most lines exit here without any alias scan.
+    if not unused_aliases or not any(m in line for m in _CLAIM_MARKERS):
+        return None
+    for tool_name, aliases in unused_aliases:
+        if any(a in line for a in aliases):
             # Format: ~~original line~~ [审计：记录中未见 xxx 相关操作]
-            processed_lines.append(f"~~{line.strip()}~~ [审计：记录中未见 {found_tool_name} 相关操作]")
+            return f"~~{line.strip()}~~ [审计：记录中未见 {tool_name} 相关操作]"
+    return None
+
+
+def audit_and_mark_hallucinations(
+    content: str, used_tools: list[str], all_tools_meta: list[dict[str, Any]]
+) -> tuple[str, bool]:
+    """
+    Detect and mark tool execution hallucinations using strikethroughs.
+    Returns (processed_content, hallucination_detected_boolean).
+    Shared by UserTurnService and SystemTurnService.
+    """
+    unused_aliases = narrow_to_content(content, unexecuted_tool_aliases(used_tools, all_tools_meta))
+    if not unused_aliases:
+        return content.strip(), False
+    hallucination_detected = False
+    processed_lines: list[str] = []
+
+    for line in content.splitlines():
+        marked = mark_unexecuted_claim(line, unused_aliases)
+        if marked is not None:
+            hallucination_detected = True
+            processed_lines.append(marked)
         else:
             processed_lines.append(line)
 
@@ -115,6 +115,8 @@ class AgentLoop:
             loop_break_reply=self.LOOP_BREAK_REPLY,
             max_total_tool_calls=max(1, int(getattr(self.brain_config, "max_total_tool_calls", 30))),
             max_turn_seconds=max(5, int(getattr(self.brain_config, "max_turn_seconds", 45))),
+            finish_on_terminal_content=bool(getattr(self.brain_config, "finish_on_terminal_content", False)),
+            parallel_tool_concurrency=max(1, int(getattr(self.brain_config, "parallel_tool_concurrency", 8))),
             hook_registry=self.hook_registry,
             tool_policy=ToolPolicy(
                 web_default=getattr(self.tools_config.policy, "web_default", "tavily"),
@@ -138,6 +140,7 @@ class AgentLoop:
             compact_history=self._compact_history,
             filter_reasoning=self._filter_reasoning,
             is_silent_reply=self._is_silent_reply,
+            history_fits_context=self._history_fits_context,
         )
 
         # Initialize Model Registry
@@ -264,6 +267,10 @@ class AgentLoop:
         self._running = False
         logger.info("Agent loop stopping")
 
+    async def close(self) -> None:
+        """Release tool resources; call once the loop has stopped."""
+        await self.tools.close()
+
     async def _process_message_wrapper(self, msg: InboundMessage) -> None:
         """
         Wrapper to process message via CommandQueue and handle response publishing/errors.
@@ -443,6 +450,14 @@ class AgentLoop:
 
         return await CommandQueue.enqueue(lane, task)
 
+    def _history_fits_context(self, session: "Session") -> bool:
+        """True when the history stays under the in-turn compaction threshold."""
+        if not self.brain_config.auto_summarize:
+            # _compact_history is a no-op, so nothing can delay the turn.
+            return True
+        # Byte upper bound only; _compact_history does the one real token count.
+        return not ContextGuard(model=self.model).may_need_compaction(session.messages)
+
     async def _compact_history(self, session: "Session") -> None:
         """
         Summarize conversation history if it exceeds the threshold.
@@ -510,7 +525,8 @@ class AgentLoop:
         Attempt to parse tool calls from raw text if the model didn't use the formal API.
         Supports both single JSON object and list of JSON objects.
         """
-        if not text:
+        # A valid call needs a JSON "arguments" key; skip the regex/JSON scan for plain replies.
+        if not text or '"arguments"' not in text:
             return []
 
         import re
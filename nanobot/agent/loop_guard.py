@@ -1,47 +1,98 @@
 """Shared loop-guard helpers for tool call repetition and hashing."""
 
 import hashlib
-import json
+from collections import Counter, deque
+from collections.abc import Iterable
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Hashable
 
 from nanobot.providers.base import ToolCallRequest
+from nanobot.utils import json_codec
 
 
 def tool_call_hash(name: str, arguments: dict[str, Any]) -> str:
-    """Stable hash for one tool call by name + sorted arguments."""
-    args_json = json.dumps(arguments, sort_keys=True)
-    return hashlib.sha256(f"{name}:{args_json}".encode()).hexdigest()
+    """Stable hash for one tool call by name + sorted arguments.
+
+    BLAKE2b-128 is much cheaper than SHA-256 and, unlike the salted builtin
+    hash(), gives the same value across restarts (call hashes end up in
+    incident records and hook payloads).
+    """
+    return tool_call_hash_from_json(name, json_codec.dumps(arguments, sort_keys=True))
+
+
+def tool_call_hash_from_json(name: str, args_json: str) -> str:
+    """Hash for one tool call whose sorted-key arguments JSON is already built."""
+    h = hashlib.blake2b(name.encode("utf-8"), digest_size=16)
+    h.update(b"\x00")
+    h.update(args_json.encode("utf-8"))
+    return h.hexdigest()
 
 
 def collect_call_ids_and_hashes(tool_calls: list[ToolCallRequest]) -> tuple[list[str], list[str]]:
     """Extract call ids and stable hashes for a batch of tool calls."""
     ids = [tc.id for tc in tool_calls if tc.id]
-    hashes = [tool_call_hash(tc.name, tc.arguments) for tc in tool_calls]
+    hashes = [tool_call_hash_from_json(tc.name, tc.arguments_json) for tc in tool_calls]
     return ids, hashes
 
 
-def is_hash_loop(current_hashes: list[str], seen_hashes: set[str]) -> bool:
+def batch_signature(hashes: list[str]) -> int:
+    """Order-independent signature for a batch of call hashes (multiplicity preserved)."""
+    return hash(frozenset(Counter(hashes).items()))
+
+
+def is_hash_loop(current_hashes: list[str], seen_hashes: "set[str] | BoundedSet") -> bool:
     """True when all current hashes already appeared in seen window."""
-    return len([h for h in current_hashes if h in seen_hashes]) == len(current_hashes)
+    return seen_hashes.issuperset(current_hashes)
 
 
-def is_id_loop(current_ids: list[str], seen_ids: set[str]) -> bool:
+def is_id_loop(current_ids: list[str], seen_ids: "set[str] | BoundedSet") -> bool:
     """True when all current ids already appeared in seen window."""
-    return bool(current_ids) and len([i for i in current_ids if i in seen_ids]) == len(current_ids)
+    return bool(current_ids) and seen_ids.issuperset(current_ids)
 
 
 @dataclass
 class RepeatWindow:
     """Track repeated signatures across iterations."""
 
-    last_signature: str | None = None
+    last_signature: Hashable | None = None
     repeat_count: int = 0
 
-    def update(self, signature: str) -> int:
+    def update(self, signature: Hashable) -> int:
         if signature == self.last_signature:
             self.repeat_count += 1
         else:
             self.last_signature = signature
             self.repeat_count = 1
         return self.repeat_count
+
+
+class BoundedSet:
+    """Set that remembers only the most recent `capacity` distinct items."""
+
+    __slots__ = ("_items", "_order", "capacity")
+
+    def __init__(self, capacity: int = 256):
+        self.capacity = capacity
+        self._items: set[Hashable] = set()
+        self._order: deque[Hashable] = deque()
+
+    def add(self, item: Hashable) -> None:
+        if item in self._items:
+            return
+        self._items.add(item)
+        self._order.append(item)
+        if len(self._order) > self.capacity:
+            self._items.discard(self._order.popleft())
+
+    def issuperset(self, items: Iterable[Hashable]) -> bool:
+        return self._items.issuperset(items)
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._order.clear()
+
+    def __contains__(self, item: object) -> bool:
+        return item in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
@@ -1,7 +1,10 @@
 """Tool registry for dynamic tool management."""
 
+import inspect
 from typing import Any
 
+from loguru import logger
+
 from nanobot.agent.tools.base import Tool, ToolResult
 
 
@@ -14,14 +17,17 @@ class ToolRegistry:
 
     def __init__(self):
         self._tools: dict[str, Tool] = {}
+        self._metadata_cache: list[dict[str, Any]] | None = None
 
     def register(self, tool: Tool) -> None:
         """Register a tool."""
         self._tools[tool.name] = tool
+        self._metadata_cache = None
 
     def unregister(self, name: str) -> None:
         """Unregister a tool by name."""
         self._tools.pop(name, None)
+        self._metadata_cache = None
 
     def get(self, name: str) -> Tool | None:
         """Get a tool by name."""
@@ -36,15 +42,22 @@ class ToolRegistry:
         return [tool.to_schema() for tool in self._tools.values()]
 
     def get_all_metadata(self) -> list[dict[str, Any]]:
-        """Get metadata for all registered tools."""
-        return [
-            {
-                "name": tool.name,
-                "description": tool.description.strip().split("\n")[0],
-                "confirm_mode": tool.confirm_mode,
-            }
-            for tool in self._tools.values()
-        ]
+        """
+        Get metadata for all registered tools.
+
+        Read on every reply audit, so the list is cached until the next
+        register/unregister. Callers must treat it as read-only.
+        """
+        if self._metadata_cache is None:
+            self._metadata_cache = [
+                {
+                    "name": tool.name,
+                    "description": tool.description.strip().split("\n")[0],
+                    "confirm_mode": tool.confirm_mode,
+                }
+                for tool in self._tools.values()
+            ]
+        return self._metadata_cache
 
     async def execute(self, name: str, params: dict[str, Any]) -> ToolResult:
         """
@@ -75,6 +88,19 @@ class ToolRegistry:
         except Exception as e:
             return ToolResult(success=False, output=f"Error executing {name}: {str(e)}")
 
+    async def close(self) -> None:
+        """Release resources held by tools that define close(), e.g. HTTP clients."""
+        for tool in list(self._tools.values()):
+            close = getattr(tool, "close", None)
+            if not callable(close):
+                continue
+            try:
+                result = close()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.warning(f"Failed to close tool '{tool.name}': {e}")
+
     @property
     def tool_names(self) -> list[str]:
         """Get list of registered tool names."""
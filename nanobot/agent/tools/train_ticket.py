@@ -13,6 +13,11 @@ from nanobot.agent.tools.base import Tool, ToolResult
 from nanobot.mcp import MCPServerConfig, MCPStdioClient
 from nanobot.utils.helpers import get_tool_config_path
 
+_STATION_CODE_JSON_RE = re.compile(r'"station_code"\s*:\s*"([A-Z]{2,4})"')
+_STATION_CODE_KV_RE = re.compile(r"station_code\s*[:=]\s*([A-Z]{2,4})")
+_STATION_CODE_BARE_RE = re.compile(r"\b([A-Z]{2,4})\b")
+_STATION_CODE_VALUE_RE = re.compile(r"[A-Z]{2,4}")
+
 
 class TrainTicketTool(Tool):
     """Stable train ticket querying tool for 12306."""
@@ -250,16 +255,40 @@ class TrainTicketTool(Tool):
         return "".join(ch for ch in flags if not (ch in seen or seen.add(ch)))
 
     def _extract_station_code(self, text: str) -> str | None:
-        # Expected patterns in 12306 MCP output include "station_code":"SHH" or "station_code: SHH".
-        m = re.search(r'"station_code"\s*:\s*"([A-Z]{2,4})"', text)
+        # 12306 MCP usually returns JSON like {"上海": {"station_code": "SHH", ...}};
+        # parse it directly and only fall back to regex scans for kv/bare-token output.
+        stripped = text.lstrip()
+        if stripped[:1] in ("{", "["):
+            try:
+                code = self._station_code_from_obj(json.loads(stripped))
+            except ValueError:
+                code = None
+            if code:
+                return code
+        m = _STATION_CODE_JSON_RE.search(text)
         if m:
             return m.group(1)
-        m = re.search(r"station_code\s*[:=]\s*([A-Z]{2,4})", text)
+        m = _STATION_CODE_KV_RE.search(text)
         if m:
             return m.group(1)
-        m = re.search(r"\b([A-Z]{2,4})\b", text)
+        m = _STATION_CODE_BARE_RE.search(text)
         return m.group(1) if m else None
 
+    @staticmethod
+    def _station_code_from_obj(obj: Any) -> str | None:
+        """Return the first `station_code` value in document order (iterative DFS)."""
+        stack: list[Any] = [obj]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                value = node.get("station_code")
+                if isinstance(value, str) and _STATION_CODE_VALUE_RE.fullmatch(value):
+                    return value
+                stack.extend(reversed(list(node.values())))
+            elif isinstance(node, list):
+                stack.extend(reversed(node))
+        return None
+
     def _render_result(self, result: dict[str, Any]) -> str:
         content = result.get("content", [])
         chunks: list[str] = []
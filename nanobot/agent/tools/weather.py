@@ -1,10 +1,87 @@
+import asyncio
+import functools
 import json
-from typing import Any, Dict, List, Optional
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 
 import httpx
+from loguru import logger
+
 from nanobot.agent.location_utils import location_query_variants, score_geo_candidate
 from nanobot.agent.tools.base import Tool, ToolResult
-from nanobot.utils.helpers import get_tool_config_path
+from nanobot.utils import json_codec
+from nanobot.utils.helpers import get_data_path, get_tool_config_path
+
+_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+}
+_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=100)
+
+# action -> (path under /v7, extra query params, error label)
+_ACTION_ENDPOINTS: Dict[str, Tuple[str, Dict[str, str], str]] = {
+    "now": ("/weather/now", {}, "天气查询失败"),
+    "forecast": ("/weather/3d", {}, "预报查询失败"),
+    "indices": ("/indices/1d", {"type": "1,3,5"}, "指数查询失败"),
+}
+_NOW_TEMPLATE = (
+    "📍 城市: {location}\n"
+    "🌡️ 温度: {temp}°C (体感 {feelsLike}°C)\n"
+    "☁️ 天气: {text}\n"
+    "💨 风力: {windDir} {windScale}级\n"
+    "🕒 观测时间: {obsTime}"
+)
+_FORECAST_LINE = "\n- {fxDate}: {textDay}转{textNight}, {tempMin}~{tempMax}°C"
+_INDICES_LINE = "\n- {name}: {category}。{text}"
+
+# QWeather data only changes every few minutes; cache successful API payloads per action.
+# Payloads, not formatted output, so each call renders the name it was asked with.
+_CACHE_TTLS = {"now": 600, "forecast": 1800, "indices": 3600}
+_CACHE_MAX_ENTRIES = 512
+_WEATHER_CACHE: "OrderedDict[tuple[str, str, str], tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+# City IDs are effectively immutable, so GeoAPI lookups are persisted across restarts.
+_GEO_CACHE_FILE = "weather_geocache.json"
+_GEO_CACHE_TTL_SECONDS = 30 * 86400
+_GEO_CACHE_MAX_ENTRIES = 2048
+
+
+def _geo_entry_ts(entry: Any) -> float:
+    """Timestamp of a persisted geo lookup; malformed entries count as expired."""
+    try:
+        return float(entry.get("ts", 0))
+    except (AttributeError, TypeError, ValueError):
+        return 0.0
+
+
+@functools.lru_cache(maxsize=4)
+def _read_config(path: str, mtime_ns: int) -> Optional[Dict[str, str]]:
+    """Parse the config file; mtime_ns is part of the cache key so edits are picked up."""
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def _cache_get(key: tuple[str, str, str]) -> Optional[Dict[str, Any]]:
+    entry = _WEATHER_CACHE.get(key)
+    if entry is None:
+        return None
+    ts, payload = entry
+    if time.monotonic() - ts >= _CACHE_TTLS[key[0]]:
+        _WEATHER_CACHE.pop(key, None)
+        return None
+    return payload
+
+
+def _cache_put(key: tuple[str, str, str], payload: Dict[str, Any]) -> None:
+    _WEATHER_CACHE[key] = (time.monotonic(), payload)
+    _WEATHER_CACHE.move_to_end(key)
+    while len(_WEATHER_CACHE) > _CACHE_MAX_ENTRIES:
+        _WEATHER_CACHE.popitem(last=False)
 
 
 class WeatherTool(Tool):
@@ -36,15 +113,28 @@ class WeatherTool(Tool):
         "required": ["action", "location"],
     }
 
+    def __init__(self) -> None:
+        self._http: Optional[httpx.AsyncClient] = None
+        self._geo_cache: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared keep-alive client, creating it on first use."""
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(timeout=10.0, headers=_HEADERS, limits=_LIMITS)
+        return self._http
+
+    async def close(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
     def _load_config(self) -> Optional[Dict[str, str]]:
         config_path = get_tool_config_path("weather_config.json")
-        if not config_path.exists():
-            return None
         try:
-            with open(config_path, "r") as f:
-                return json.load(f)
-        except Exception:
+            mtime = config_path.stat().st_mtime_ns
+        except OSError:
             return None
+        return _read_config(str(config_path), mtime)
 
     async def execute(self, action: str, location: str, lang: str = "zh", **kwargs: Any) -> ToolResult:
         config = self._load_config()
@@ -63,111 +153,208 @@ class WeatherTool(Tool):
                 output="Error: QWeather key is missing.",
                 remedy="请在 weather_config.json 中添加 key 字段。"
             )
-        
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        }
 
-        async with httpx.AsyncClient(timeout=10.0, headers=headers) as client:
+        client = self._get_client()
+        try:
+            # 1. Resolve Location ID
+            location_id = location
+            location_name = location
+            if not location.isdigit():
+                resolved = self._geo_cache_get(location, lang)
+                if resolved is None:
+                    resolved = await self._lookup_location(client, location, host, key, lang)
+                    if resolved is not None:
+                        await self._geo_cache_put(location, lang, resolved)
+                if resolved is None:
+                    return ToolResult(
+                        success=False,
+                        output=(
+                            f"无法解析地点 '{location}'。当前天气接口通常支持到区县/城市级，"
+                            "乡镇名称可能无法直接识别。"
+                        ),
+                        remedy="请改用“市/区县”名称，或提供 9 位地点 ID（如北京 101010100）。",
+                    )
+                location_id, location_name = resolved
+
+            # 2. Weather Action
+            base_url = f"https://{host}/v7"
+            params = {"location": location_id, "key": key, "lang": lang}
+
+            if action in _CACHE_TTLS:
+                cache_key = (action, location_id, lang)
+                payload = _cache_get(cache_key)
+                if payload is None:
+                    fetched = await self._fetch_payload(client, action, base_url, params)
+                    if isinstance(fetched, ToolResult):
+                        return fetched
+                    payload = fetched
+                    _cache_put(cache_key, payload)
+                return self._format_action(action, payload, location_name)
+
+            if action == "search":
+                return ToolResult(success=True, output=f"已找到 {location_name}，ID 为 {location_id}")
+
+            return ToolResult(success=False, output=f"未知动作: {action}")
+
+        except Exception as e:
+            return ToolResult(success=False, output=f"Weather Tool Error: {str(e)}")
+
+    async def _fetch_payload(
+        self,
+        client: httpx.AsyncClient,
+        action: str,
+        base_url: str,
+        params: Dict[str, str],
+    ) -> Dict[str, Any] | ToolResult:
+        """Return the decoded QWeather payload, or a failed ToolResult."""
+        endpoint = _ACTION_ENDPOINTS.get(action)
+        if endpoint is None:
+            return ToolResult(success=False, output=f"未知动作: {action}")
+        path, extra_params, error_label = endpoint
+        resp = await client.get(f"{base_url}{path}", params={**params, **extra_params})
+        try:
+            data = json_codec.loads(resp.content)
+        except ValueError as e:
+            return ToolResult(success=False, output=f"解析失败: {e}")
+        if data.get("code") != "200":
+            return ToolResult(success=False, output=f"{error_label}: {data.get('code')}")
+        return data
+
+    def _format_action(self, action: str, data: Dict[str, Any], location_name: str) -> ToolResult:
+        if action == "now":
+            return ToolResult(
+                success=True, output=_NOW_TEMPLATE.format(location=location_name, **data["now"])
+            )
+        if action == "forecast":
+            lines = "".join(_FORECAST_LINE.format(**day) for day in data["daily"])
+            return ToolResult(success=True, output=f"📅 {location_name} 3日天气预报:{lines}")
+        lines = "".join(_INDICES_LINE.format(**item) for item in data["daily"])
+        return ToolResult(success=True, output=f"💡 {location_name} 生活建议:{lines}")
+
+    async def _lookup_location(
+        self, client: httpx.AsyncClient, location: str, host: str, key: str, lang: str
+    ) -> Optional[Tuple[str, str]]:
+        """Resolve a place name to (location_id, display_name) via GeoAPI."""
+        # GeoAPI domain discovery.
+        # Some keys are bound to a custom host, so probe it alongside the public
+        # domains concurrently and take the first usable answer.
+        domains = list(dict.fromkeys([host, "geoapi.qweather.com", "devapi.qweather.com"]))
+        for query in location_query_variants(location):
+            pending = {
+                asyncio.create_task(self._probe_geo_domain(client, domain, query, location, key, lang))
+                for domain in domains
+            }
             try:
-                # 1. Resolve Location ID
-                location_id = location
-                location_name = location
-                if not location.isdigit():
-                    # GeoAPI domain discovery.
-                    # Some keys are bound to a custom host; use that first.
-                    found = False
-                    variants = location_query_variants(location)
-                    for query in variants:
-                        for geo_domain in [host, "geoapi.qweather.com", "devapi.qweather.com"]:
-                            # Official endpoint is /geo/v2/city/lookup.
-                            # Keep legacy /v2 path as fallback for provider-side compatibility.
-                            for geo_path in ["/geo/v2/city/lookup", "/v2/city/lookup"]:
-                                geo_url = f"https://{geo_domain}{geo_path}"
-                                try:
-                                    geo_resp = await client.get(
-                                        geo_url,
-                                        params={"location": query, "key": key, "lang": lang, "number": 10},
-                                    )
-                                    if geo_resp.status_code == 200:
-                                        geo_data = geo_resp.json()
-                                        locs = geo_data.get("location") or []
-                                        if geo_data.get("code") == "200" and isinstance(locs, list) and locs:
-                                            loc_info = self._pick_best_location(location, locs)
-                                            location_id = str(loc_info.get("id", "")).strip()
-                                            display_parts = [
-                                                str(loc_info.get("adm1", "")).strip(),
-                                                str(loc_info.get("adm2", "")).strip(),
-                                                str(loc_info.get("name", "")).strip(),
-                                            ]
-                                            location_name = " ".join([x for x in display_parts if x]).strip() or query
-                                            if location_id:
-                                                found = True
-                                                break
-                                except Exception:
-                                    continue
-                            if found:
-                                break
-                        if found:
-                            break
-                    
-                    if not found:
-                        return ToolResult(
-                            success=False,
-                            output=(
-                                f"无法解析地点 '{location}'。当前天气接口通常支持到区县/城市级，"
-                                "乡镇名称可能无法直接识别。"
-                            ),
-                            remedy="请改用“市/区县”名称，或提供 9 位地点 ID（如北京 101010100）。",
-                        )
-
-                # 2. Weather Action
-                base_url = f"https://{host}/v7"
-                params = {"location": location_id, "key": key, "lang": lang}
-
-                if action == "now":
-                    resp = await client.get(f"{base_url}/weather/now", params=params)
-                    data = resp.json()
-                    if data.get("code") != "200":
-                        return ToolResult(success=False, output=f"天气查询失败: {data.get('code')}")
-                    
-                    now = data["now"]
-                    output = [
-                        f"📍 城市: {location_name}",
-                        f"🌡️ 温度: {now['temp']}°C (体感 {now['feelsLike']}°C)",
-                        f"☁️ 天气: {now['text']}",
-                        f"💨 风力: {now['windDir']} {now['windScale']}级",
-                        f"🕒 观测时间: {now['obsTime']}"
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        resolved = task.result()
+                        if resolved is not None:
+                            return resolved
+            finally:
+                for task in pending:
+                    task.cancel()
+        return None
+
+    async def _probe_geo_domain(
+        self,
+        client: httpx.AsyncClient,
+        geo_domain: str,
+        query: str,
+        location: str,
+        key: str,
+        lang: str,
+    ) -> Optional[Tuple[str, str]]:
+        # Official endpoint is /geo/v2/city/lookup.
+        # Keep legacy /v2 path as fallback for provider-side compatibility.
+        for geo_path in ["/geo/v2/city/lookup", "/v2/city/lookup"]:
+            geo_url = f"https://{geo_domain}{geo_path}"
+            try:
+                geo_resp = await client.get(
+                    geo_url,
+                    params={"location": query, "key": key, "lang": lang, "number": 10},
+                )
+                if geo_resp.status_code != 200:
+                    continue
+                geo_data = json_codec.loads(geo_resp.content)
+                locs = geo_data.get("location") or []
+                if geo_data.get("code") == "200" and isinstance(locs, list) and locs:
+                    loc_info = self._pick_best_location(location, locs)
+                    location_id = str(loc_info.get("id", "")).strip()
+                    display_parts = [
+                        str(loc_info.get("adm1", "")).strip(),
+                        str(loc_info.get("adm2", "")).strip(),
+                        str(loc_info.get("name", "")).strip(),
                     ]
-                    return ToolResult(success=True, output="\n".join(output))
-
-                elif action == "forecast":
-                    resp = await client.get(f"{base_url}/weather/3d", params=params)
-                    data = resp.json()
-                    if data.get("code") != "200":
-                        return ToolResult(success=False, output=f"预报查询失败: {data.get('code')}")
-                    output = [f"📅 {location_name} 3日天气预报:"]
-                    for day in data["daily"]:
-                        output.append(f"- {day['fxDate']}: {day['textDay']}转{day['textNight']}, {day['tempMin']}~{day['tempMax']}°C")
-                    return ToolResult(success=True, output="\n".join(output))
-
-                elif action == "indices":
-                    resp = await client.get(f"{base_url}/indices/1d", params={**params, "type": "1,3,5"})
-                    data = resp.json()
-                    if data.get("code") != "200":
-                        return ToolResult(success=False, output=f"指数查询失败: {data.get('code')}")
-                    output = [f"💡 {location_name} 生活建议:"]
-                    for item in data["daily"]:
-                        output.append(f"- {item['name']}: {item['category']}。{item['text']}")
-                    return ToolResult(success=True, output="\n".join(output))
-
-                elif action == "search":
-                    return ToolResult(success=True, output=f"已找到 {location_name}，ID 为 {location_id}")
-
-                return ToolResult(success=False, output=f"未知动作: {action}")
-
-            except Exception as e:
-                return ToolResult(success=False, output=f"Weather Tool Error: {str(e)}")
+                    location_name = " ".join([x for x in display_parts if x]).strip() or query
+                    if location_id:
+                        return location_id, location_name
+            except Exception:
+                continue
+        return None
+
+    def _geo_cache_key(self, location: str, lang: str) -> str:
+        return f"{lang}:{location.strip().lower()}"
+
+    def _load_geo_cache(self) -> Dict[str, Dict[str, Any]]:
+        if self._geo_cache is None:
+            self._geo_cache = {}
+            path = get_data_path() / _GEO_CACHE_FILE
+            if path.exists():
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                    if isinstance(data, dict):
+                        self._geo_cache = data
+                except Exception as e:
+                    logger.warning(f"Failed to load weather geo cache: {e}")
+        return self._geo_cache
+
+    def _geo_cache_get(self, location: str, lang: str) -> Optional[Tuple[str, str]]:
+        entry = self._load_geo_cache().get(self._geo_cache_key(location, lang))
+        if not isinstance(entry, dict):
+            return None
+        if time.time() - _geo_entry_ts(entry) >= _GEO_CACHE_TTL_SECONDS:
+            return None
+        location_id = str(entry.get("id", "")).strip()
+        if not location_id:
+            return None
+        return location_id, str(entry.get("name", "")).strip() or location
+
+    async def _geo_cache_put(self, location: str, lang: str, resolved: Tuple[str, str]) -> None:
+        cache = self._load_geo_cache()
+        now = time.time()
+        cache[self._geo_cache_key(location, lang)] = {
+            "id": resolved[0],
+            "name": resolved[1],
+            "ts": now,
+        }
+        # Drop expired lookups, then the oldest ones beyond the cap.
+        stamps = {k: _geo_entry_ts(v) for k, v in cache.items()}
+        for key, ts in stamps.items():
+            if now - ts >= _GEO_CACHE_TTL_SECONDS:
+                del cache[key]
+        overflow = len(cache) - _GEO_CACHE_MAX_ENTRIES
+        if overflow > 0:
+            for key in sorted(cache, key=stamps.__getitem__)[:overflow]:
+                del cache[key]
+        await asyncio.to_thread(self._write_geo_cache, dict(cache))
+
+    @staticmethod
+    def _write_geo_cache(data: Dict[str, Dict[str, Any]]) -> None:
+        path = get_data_path() / _GEO_CACHE_FILE
+        try:
+            # Write a sibling temp file and swap it in, so readers never see a partial file.
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(tmp_name, path)
+            except BaseException:
+                os.unlink(tmp_name)
+                raise
+        except Exception as e:
+            logger.warning(f"Failed to save weather geo cache: {e}")
 
     def _pick_best_location(self, query: str, locs: List[Dict[str, Any]]) -> Dict[str, Any]:
         return max(locs, key=lambda item: score_geo_candidate(query, item))
@@ -1,29 +1,101 @@
 """Turn execution engine shared by foreground and system message flows."""
 
 import asyncio
-import json
 import re
 import time
-from typing import Any, Awaitable, Callable
+from collections import Counter, OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Mapping, Sequence
 
 from loguru import logger
 
 from nanobot.agent.context_guard import ContextGuard
 from nanobot.agent.loop_guard import (
+    BoundedSet,
     RepeatWindow,
+    batch_signature,
     collect_call_ids_and_hashes,
     is_hash_loop,
     is_id_loop,
 )
 from nanobot.agent.tool_policy import ToolPolicy
 from nanobot.agent.tools.base import ToolResult, ToolSeverity
+from nanobot.hooks import trigger_registry_hook
 from nanobot.providers.base import ToolCallRequest
-from nanobot.utils.audit import log_event
+from nanobot.utils.audit import log_event, log_events
+
+_VALUE_TOKEN_RE = re.compile(r"[\u4e00-\u9fff]{2,}|[A-Za-z0-9_+-]{2,}")
+# User phrasing that lets the model fill in context fields on its own.
+_INFERENCE_HINT_RE = re.compile("|".join(map(re.escape, ("默认", "按上次", "沿用", "你决定", "随便", "任意"))))
+# Requests whose tool arguments depend on user context (place, time zone, ...).
+_CONTEXT_SENSITIVE_RE = re.compile(
+    "|".join(
+        map(
+            re.escape,
+            (
+                "天气",
+                "温度",
+                "降雨",
+                "空气质量",
+                "穿衣",
+                "出行",
+                "路线",
+                "导航",
+                "附近",
+                "餐厅",
+                "酒店",
+                "机票",
+                "火车",
+            ),
+        )
+    )
+)
+
+
+# Tool argument keys whose values must come from the user, with their display labels.
+_SENSITIVE_ARG_LABELS = (
+    ("location", "地点"),
+    ("city", "城市"),
+    ("region", "地区"),
+    ("province", "省份"),
+    ("country", "国家"),
+    ("timezone", "时区"),
+)
+_FLAGGED_SEVERITIES = (ToolSeverity.WARN, ToolSeverity.ERROR, ToolSeverity.FATAL)
+# Assistant text that announces work still to come rather than answering.
+_PENDING_WORK_RE = re.compile(
+    r"让我|我来|我先|稍等|请稍|正在|马上|接下来|let me|i'll|i will|one moment", re.IGNORECASE
+)
+
+# Python 3.12+: run each tool coroutine up to its first await at spawn time, so
+# tools that finish synchronously never round-trip through the event loop.
+_EAGER_TASK_FACTORY = getattr(asyncio, "eager_task_factory", None)
+
+
+def _start_task(coro: Awaitable[Any]) -> asyncio.Task:
+    if _EAGER_TASK_FACTORY is not None:
+        return _EAGER_TASK_FACTORY(asyncio.get_running_loop(), coro)
+    return asyncio.create_task(coro)
 
 
 class TurnEngine:
     """Execute one conversational turn with tool-calling loop controls."""
 
+    # Forced final summaries are reused when the same recent context hits a budget again.
+    SUMMARY_CACHE_TTL_SECONDS = 24 * 3600
+    SUMMARY_CACHE_MAX_ENTRIES = 64
+    SUMMARY_CACHE_KEY_TAIL = 20
+    SEEN_TOOL_CALL_WINDOW = 256
+    TRACE_HISTORY_MAX_ENTRIES = 200
+    COMPACT_KEEP_RECENT = 10
+    FORCED_SUMMARY_RECENT_TOOLS = 6
+    # Compaction waits this long for the LLM summary before using the deterministic one.
+    COMPACT_SUMMARY_TIMEOUT_SECONDS = 6.0
+    # Older plain-text messages most relevant to the current ask survive compaction verbatim.
+    COMPACT_PINNED_MESSAGES = 2
+    COMPACT_PIN_MAX_CHARS = 1000
+    COMPACT_PIN_RECENCY_WEIGHT = 0.2
+
     def __init__(
         self,
         *,
@@ -41,6 +113,8 @@ class TurnEngine:
         max_turn_seconds: int = 45,
         hook_registry: Any | None = None,
         tool_policy: ToolPolicy | None = None,
+        finish_on_terminal_content: bool = False,
+        parallel_tool_concurrency: int = 8,
     ):
         self.context = context
         self.executor = executor
@@ -56,8 +130,13 @@ class TurnEngine:
         self.max_turn_seconds = max_turn_seconds
         self.hook_registry = hook_registry
         self.tool_policy = tool_policy or ToolPolicy()
-        self._trace_tools: dict[str, list[str]] = {}
-        self._trace_exec_report: dict[str, dict[str, Any]] = {}
+        # Opt-in: end the turn after a clean tool round when the model already answered.
+        self.finish_on_terminal_content = finish_on_terminal_content
+        self.parallel_tool_concurrency = max(1, parallel_tool_concurrency)
+        self._trace_tools: OrderedDict[str, list[str]] = OrderedDict()
+        self._trace_exec_report: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._summary_cache: OrderedDict[int, tuple[float, str]] = OrderedDict()
+        self._context_guard = ContextGuard(model=model)
 
     async def run(
         self,
@@ -71,25 +150,37 @@ class TurnEngine:
     ) -> str | None:
         iteration = 0
         final_content = None
-        seen_tool_call_ids: set[str] = set()
-        seen_tool_call_hashes: set[str] = set()
+        # Loop detection only needs recent history; cap memory on very long turns.
+        seen_tool_call_ids = BoundedSet(self.SEEN_TOOL_CALL_WINDOW)
+        seen_tool_call_hashes = BoundedSet(self.SEEN_TOOL_CALL_WINDOW)
         repeat_window = RepeatWindow()
         total_tool_calls: int = 0
-        tool_call_counts: dict[str, int] = {}
+        tool_call_counts: Counter[str] = Counter()
+        # Names of the last few executed calls, for the forced-summary fallback.
+        recent_tool_names: deque[str] = deque(maxlen=self.FORCED_SUMMARY_RECENT_TOOLS)
         max_total_tool_calls = self.max_total_tool_calls
         per_tool_limits: dict[str, int] = {}
         deadline = time.monotonic() + float(self.max_turn_seconds)
         failed_tools: set[str] = set()
-        used_tools: list[str] = []
+        # Insertion-ordered set of tool source keys used this turn.
+        used_tools: dict[str, None] = {}
         consecutive_fail_rounds = 0
         success_tool_calls = 0
         failed_tool_calls = 0
+        # Registered tools do not change within a turn; build their schemas once.
+        tool_definitions = self.get_tools_definitions()
+        # Within a turn the policy's answer only changes when the failed-tool set does.
+        exposed_tools_by_failed: dict[frozenset[str], list[dict[str, Any]]] = {}
+        # The user message is fixed for the turn (and may be compacted away later).
+        user_text = self._latest_user_text(messages)
 
         while iteration < self.max_iterations:
             if time.monotonic() >= deadline:
                 final_content = await self._finalize_after_budget(
                     messages=messages,
                     reason=f"单轮处理超时（>{self.max_turn_seconds}s）",
+                    tool_stats=tool_call_counts,
+                    recent_tools=recent_tool_names,
                 )
                 await self._trigger_hook(
                     "turn_iteration_end",
@@ -103,27 +194,31 @@ class TurnEngine:
                 {"trace_id": trace_id, "iteration": iteration, "max_iterations": self.max_iterations},
             )
             if trace_id:
-                logger.debug(f"[TraceID: {trace_id}] Starting iteration {iteration}")
+                logger.debug("[TraceID: {}] Starting iteration {}", trace_id, iteration)
             iteration_state = "running"
             current_tool_calls_count = 0
 
             try:
                 remaining = max(0.5, deadline - time.monotonic())
-                response = await asyncio.wait_for(
-                    self.chat_with_failover(
+                failed_key = frozenset(failed_tools)
+                exposed_tools = exposed_tools_by_failed.get(failed_key)
+                if exposed_tools is None:
+                    exposed_tools = self.tool_policy.filter_tools(
                         messages=messages,
-                        tools=self.tool_policy.filter_tools(
-                            messages=messages,
-                            tool_definitions=self.get_tools_definitions(),
-                            failed_tools=failed_tools,
-                        ),
-                    ),
+                        tool_definitions=tool_definitions,
+                        failed_tools=failed_tools,
+                    )
+                    exposed_tools_by_failed[failed_key] = exposed_tools
+                response = await asyncio.wait_for(
+                    self.chat_with_failover(messages=messages, tools=exposed_tools),
                     timeout=remaining,
                 )
             except TimeoutError:
                 final_content = await self._finalize_after_budget(
                     messages=messages,
                     reason=f"模型响应超时（>{self.max_turn_seconds}s）",
+                    tool_stats=tool_call_counts,
+                    recent_tools=recent_tool_names,
                 )
                 iteration_state = "model_timeout"
                 await self._trigger_hook(
@@ -140,6 +235,8 @@ class TurnEngine:
                 final_content = await self._finalize_after_budget(
                     messages=messages,
                     reason="模型调用异常，触发最终总结",
+                    tool_stats=tool_call_counts,
+                    recent_tools=recent_tool_names,
                 )
                 iteration_state = "model_error"
                 await self._trigger_hook(
@@ -172,7 +269,7 @@ class TurnEngine:
                 )
                 break
 
-            clarification = self._clarification_needed(messages=messages, tool_calls=tool_calls)
+            clarification = self._clarification_needed(user_text=user_text, tool_calls=tool_calls)
             if clarification:
                 final_content = clarification
                 iteration_state = "clarification_required"
@@ -195,7 +292,12 @@ class TurnEngine:
                 per_tool_limits=per_tool_limits,
             )
             if budget_reason:
-                final_content = await self._finalize_after_budget(messages=messages, reason=budget_reason)
+                final_content = await self._finalize_after_budget(
+                    messages=messages,
+                    reason=budget_reason,
+                    tool_stats=tool_call_counts,
+                    recent_tools=recent_tool_names,
+                )
                 iteration_state = "budget_limited"
                 await self._trigger_hook(
                     "turn_iteration_end",
@@ -258,33 +360,41 @@ class TurnEngine:
             for h in current_hashes:
                 seen_tool_call_hashes.add(h)
 
-            tool_call_dicts = [
-                {
-                    "id": tc.id,
-                    "type": "function",
-                    "function": {"name": tc.name, "arguments": json.dumps(tc.arguments)},
-                }
-                for tc in tool_calls
-            ]
+            # Single pass: build the assistant payload, per-tool counts and source keys.
+            tool_call_dicts = []
+            append_call_dict = tool_call_dicts.append
             for tc in tool_calls:
-                tool_key = tc.name
+                name = tc.name
+                append_call_dict(
+                    {
+                        "id": tc.id,
+                        "type": "function",
+                        "function": {"name": name, "arguments": tc.arguments_json},
+                    }
+                )
+                tool_call_counts[name] += 1
+                recent_tool_names.append(name)
+                tool_key = name
                 # Preserve MCP server dimension so source attribution can be specific.
-                if tc.name == "mcp":
+                if name == "mcp":
                     try:
                         server = str((tc.arguments or {}).get("server", "")).strip()
                     except Exception:
                         server = ""
                     if server:
                         tool_key = f"mcp:{server}"
-                if tool_key not in used_tools:
-                    used_tools.append(tool_key)
+                used_tools[tool_key] = None
             self.context.add_assistant_message(messages, response.content, tool_call_dicts)
+            terminal_candidate = self.finish_on_terminal_content and self._looks_terminal(response.content)
+            clean_results: list[bool] | None = [] if terminal_candidate else None
             tool_exec_results = await self._execute_tool_calls(
                 messages=messages,
                 tool_calls=tool_calls,
                 trace_id=trace_id,
                 include_severity=include_severity,
                 parallel_tool_exec=parallel_tool_exec,
+                clean_results=clean_results,
+                deadline=deadline,
             )
             all_failed = bool(tool_exec_results) and all(not ok for _name, ok in tool_exec_results)
             if all_failed:
@@ -299,12 +409,12 @@ class TurnEngine:
                     failed_tools.add(name)
                     failed_tool_calls += 1
             total_tool_calls += len(tool_calls)
-            for tc in tool_calls:
-                tool_call_counts[tc.name] = tool_call_counts.get(tc.name, 0) + 1
             if consecutive_fail_rounds >= 2:
                 final_content = await self._finalize_after_budget(
                     messages=messages,
                     reason="连续两轮工具调用均失败，已物理熔断",
+                    tool_stats=tool_call_counts,
+                    recent_tools=recent_tool_names,
                 )
                 iteration_state = "tool_fuse"
                 await self._trigger_hook(
@@ -317,6 +427,21 @@ class TurnEngine:
                     },
                 )
                 break
+            if clean_results and all(clean_results):
+                # The model already answered alongside its tool calls and every tool
+                # succeeded without hints, so skip the follow-up LLM round-trip.
+                final_content = response.content
+                iteration_state = "final_text_with_tools"
+                await self._trigger_hook(
+                    "turn_iteration_end",
+                    {
+                        "trace_id": trace_id,
+                        "iteration": iteration,
+                        "status": iteration_state,
+                        "tool_calls": current_tool_calls_count,
+                    },
+                )
+                break
             if compact_after_tools:
                 await self._compact_messages_if_needed(messages, trace_id)
             iteration_state = "tool_round_completed"
@@ -334,6 +459,8 @@ class TurnEngine:
             final_content = await self._finalize_after_budget(
                 messages=messages,
                 reason="模型未返回有效文本，触发最终总结",
+                tool_stats=tool_call_counts,
+                recent_tools=recent_tool_names,
             )
         log_event(
             {
@@ -348,10 +475,9 @@ class TurnEngine:
             {"trace_id": trace_id, "iterations": iteration, "has_content": bool((final_content or "").strip())},
         )
         if trace_id:
-            self._trace_tools[trace_id] = used_tools
-            if len(self._trace_tools) > 200:
-                oldest = next(iter(self._trace_tools.keys()))
-                self._trace_tools.pop(oldest, None)
+            self._trace_tools[trace_id] = list(used_tools)
+            if len(self._trace_tools) > self.TRACE_HISTORY_MAX_ENTRIES:
+                self._trace_tools.popitem(last=False)
             self._trace_exec_report[trace_id] = {
                 "total_tool_calls": int(total_tool_calls),
                 "success_tool_calls": int(success_tool_calls),
@@ -359,9 +485,8 @@ class TurnEngine:
                 "used_tools": list(used_tools),
                 "failed_tools": sorted(list(failed_tools)),
             }
-            if len(self._trace_exec_report) > 200:
-                oldest = next(iter(self._trace_exec_report.keys()))
-                self._trace_exec_report.pop(oldest, None)
+            if len(self._trace_exec_report) > self.TRACE_HISTORY_MAX_ENTRIES:
+                self._trace_exec_report.popitem(last=False)
         return final_content
 
     def pop_used_tools(self, trace_id: str | None) -> list[str]:
@@ -375,12 +500,7 @@ class TurnEngine:
         return self._trace_exec_report.pop(trace_id, {})
 
     async def _trigger_hook(self, event: str, payload: dict[str, Any]) -> None:
-        if self.hook_registry is None:
-            return
-        trigger = getattr(self.hook_registry, "trigger_hook", None)
-        if not callable(trigger):
-            return
-        await trigger(event, payload)
+        await trigger_registry_hook(self.hook_registry, event, payload)
 
     def _is_empty_like_response(self, content: str | None) -> bool:
         if content is None:
@@ -388,6 +508,14 @@ class TurnEngine:
         text = content.strip()
         return text in {"", "[正在处理中...]", "正在处理中..."}
 
+    def _looks_terminal(self, content: str | None) -> bool:
+        if self._is_empty_like_response(content):
+            return False
+        text = content.strip()
+        if text.endswith((":", "：", "...", "…")):
+            return False
+        return not _PENDING_WORK_RE.search(text)
+
     def _inject_self_correction(self, messages: list[dict[str, Any]]) -> None:
         messages.append({"role": "system", "content": self.self_correction_prompt})
 
@@ -395,17 +523,20 @@ class TurnEngine:
         self,
         iteration: int,
         tool_calls: list[ToolCallRequest],
-        seen_tool_call_ids: set[str],
-        seen_tool_call_hashes: set[str],
+        seen_tool_call_ids: BoundedSet,
+        seen_tool_call_hashes: BoundedSet,
         repeat_window: RepeatWindow,
     ) -> tuple[bool, list[str], list[str]]:
+        # Hashes and the repeat window must be fed every round (later rounds compare
+        # against them), but the membership checks only matter once a loop can fire.
         current_ids, current_hashes = collect_call_ids_and_hashes(tool_calls)
-        id_loop = is_id_loop(current_ids, seen_tool_call_ids)
-        hash_loop = is_hash_loop(current_hashes, seen_tool_call_hashes)
-        current_signature = ",".join(sorted(current_hashes))
-        repeat_count = repeat_window.update(current_signature)
+        repeat_count = repeat_window.update(batch_signature(current_hashes))
+        if iteration <= 3 or repeat_count < 3:
+            return False, current_ids, current_hashes
 
-        is_strict_loop = iteration > 3 and repeat_count >= 3 and (id_loop or hash_loop)
+        is_strict_loop = is_id_loop(current_ids, seen_tool_call_ids) or is_hash_loop(
+            current_hashes, seen_tool_call_hashes
+        )
         return is_strict_loop, current_ids, current_hashes
 
     def _tool_budget_reason(
@@ -421,23 +552,31 @@ class TurnEngine:
         if projected_total > max_total_tool_calls:
             return f"总工具调用预算超限（{projected_total}/{max_total_tool_calls}）"
 
-        projected_counts = dict(tool_call_counts)
-        for tc in tool_calls:
-            projected_counts[tc.name] = projected_counts.get(tc.name, 0) + 1
+        if not per_tool_limits:
+            return None
 
+        # Only this round's increments are counted; the running totals are not copied.
+        increments = Counter(tc.name for tc in tool_calls)
         for tool_name, limit in per_tool_limits.items():
-            count = projected_counts.get(tool_name, 0)
+            count = tool_call_counts.get(tool_name, 0) + increments[tool_name]
             if count > limit:
                 return f"工具 {tool_name} 调用预算超限（{count}/{limit}）"
 
         return None
 
-    def _build_forced_summary(self, *, messages: list[dict[str, Any]], reason: str) -> str:
-        tool_msgs = [m for m in messages if m.get("role") == "tool"]
-        tool_name_list = [str(m.get("name", "unknown")) for m in tool_msgs]
-        tool_stats: dict[str, int] = {}
-        for name in tool_name_list:
-            tool_stats[name] = tool_stats.get(name, 0) + 1
+    def _build_forced_summary(
+        self,
+        *,
+        messages: list[dict[str, Any]],
+        reason: str,
+        tool_stats: Mapping[str, int] | None = None,
+        recent_tools: Sequence[str] | None = None,
+    ) -> str:
+        if tool_stats is None or recent_tools is None:
+            # No running stats from run(); fall back to scanning the history.
+            tool_name_list = [str(m.get("name", "unknown")) for m in messages if m.get("role") == "tool"]
+            tool_stats = Counter(tool_name_list)
+            recent_tools = tool_name_list[-self.FORCED_SUMMARY_RECENT_TOOLS:]
 
         lines = [f"模型已超过工具调用限制，本轮已停止继续试探：{reason}。"]
         if tool_stats:
@@ -446,14 +585,19 @@ class TurnEngine:
         else:
             lines.append("本轮未形成有效工具结果。")
 
-        recent_tools = tool_name_list[-6:]
         if recent_tools:
             lines.append(f"最近步骤：{' -> '.join(recent_tools)}")
 
         return "\n".join(lines)
 
-    async def _finalize_after_budget(self, *, messages: list[dict[str, Any]], reason: str) -> str:
-        fallback = self._build_forced_summary(messages=messages, reason=reason)
+    async def _finalize_after_budget(
+        self,
+        *,
+        messages: list[dict[str, Any]],
+        reason: str,
+        tool_stats: Mapping[str, int] | None = None,
+        recent_tools: Sequence[str] | None = None,
+    ) -> str:
         try:
             summary_prompt = (
                 "你已经触发工具调用预算限制，禁止再调用任何工具。"
@@ -462,29 +606,67 @@ class TurnEngine:
                 "1) 已完成内容 2) 当前明确结论 3) 未完成或不确定项。"
                 "要求：简洁、可执行，不要输出内部推理。"
             )
-            summary_messages = list(messages) + [{"role": "system", "content": summary_prompt}]
+            # Single copy; the caller's history must never show the transient prompt.
+            summary_messages = [*messages, {"role": "system", "content": summary_prompt}]
+            cache_key = self._summary_cache_key(messages, reason)
+            cached = self._summary_cache_get(cache_key)
+            if cached:
+                return cached
             response = await asyncio.wait_for(
                 self.chat_with_failover(messages=summary_messages, tools=[]),
                 timeout=12.0,
             )
             content = (response.content or "").strip()
             if content:
+                self._summary_cache_put(cache_key, content)
                 return content
         except Exception:
             pass
-        return fallback
+        return self._build_forced_summary(
+            messages=messages, reason=reason, tool_stats=tool_stats, recent_tools=recent_tools
+        )
+
+    def _summary_cache_key(self, messages: list[dict[str, Any]], reason: str) -> int | None:
+        # Key on the history length plus the tail only; hashing the full
+        # transcript every call costs more than the summary it might save.
+        tail: list[tuple[Any, str, Any]] = []
+        for message in messages[-self.SUMMARY_CACHE_KEY_TAIL:]:
+            content = message.get("content")
+            if not isinstance(content, str):
+                return None
+            tail.append((message.get("role"), content, message.get("tool_call_id")))
+        return hash((self.model, reason, len(messages), tuple(tail)))
+
+    def _summary_cache_get(self, key: int | None) -> str | None:
+        if key is None:
+            return None
+        entry = self._summary_cache.get(key)
+        if entry is None:
+            return None
+        ts, content = entry
+        if time.monotonic() - ts >= self.SUMMARY_CACHE_TTL_SECONDS:
+            self._summary_cache.pop(key, None)
+            return None
+        return content
+
+    def _summary_cache_put(self, key: int | None, content: str) -> None:
+        if key is None:
+            return
+        self._summary_cache[key] = (time.monotonic(), content)
+        self._summary_cache.move_to_end(key)
+        while len(self._summary_cache) > self.SUMMARY_CACHE_MAX_ENTRIES:
+            self._summary_cache.popitem(last=False)
 
     def _clarification_needed(
         self,
         *,
-        messages: list[dict[str, Any]],
+        user_text: str,
         tool_calls: list[ToolCallRequest],
     ) -> str | None:
         """
         Generic guard for context-sensitive parameters:
         if model injects values not clearly mentioned by user, ask for confirmation first.
         """
-        user_text = self._latest_user_text(messages)
         if not user_text:
             return None
         if self._user_allows_inference(user_text):
@@ -494,25 +676,19 @@ class TurnEngine:
 
         # Keep this guard focused on high-risk context fields.
         # Operational fields (chat_id/account/recipient) are handled by the tool itself.
-        sensitive_labels = {
-            "location": "地点",
-            "city": "城市",
-            "region": "地区",
-            "province": "省份",
-            "country": "国家",
-            "timezone": "时区",
-        }
-
+        user_tokens: set[str] | None = None
         for tc in tool_calls:
             args = tc.arguments or {}
-            for key, label in sensitive_labels.items():
+            for key, label in _SENSITIVE_ARG_LABELS:
                 value = args.get(key)
                 if not isinstance(value, str):
                     continue
                 candidate = value.strip()
-                if not candidate:
+                if not candidate or candidate in user_text:
                     continue
-                if not self._value_mentioned(user_text, candidate):
+                if user_tokens is None:
+                    user_tokens = set(_VALUE_TOKEN_RE.findall(user_text.lower()))
+                if not self._value_mentioned(user_text, candidate, user_tokens):
                     return f"在继续之前需要你确认：本次{label}是“{candidate}”吗？如果不是，请告诉我正确的{label}。"
         return None
 
@@ -525,52 +701,56 @@ class TurnEngine:
         return ""
 
     def _user_allows_inference(self, user_text: str) -> bool:
-        hints = ("默认", "按上次", "沿用", "你决定", "随便", "任意")
-        return any(h in user_text for h in hints)
+        return _INFERENCE_HINT_RE.search(user_text) is not None
 
     def _is_context_sensitive_request(self, user_text: str) -> bool:
-        keywords = (
-            "天气",
-            "温度",
-            "降雨",
-            "空气质量",
-            "穿衣",
-            "出行",
-            "路线",
-            "导航",
-            "附近",
-            "餐厅",
-            "酒店",
-            "机票",
-            "火车",
-        )
-        return any(k in user_text for k in keywords)
+        return _CONTEXT_SENSITIVE_RE.search(user_text) is not None
 
-    def _value_mentioned(self, user_text: str, candidate: str) -> bool:
+    def _value_mentioned(
+        self, user_text: str, candidate: str, user_tokens: set[str] | None = None
+    ) -> bool:
         if candidate in user_text:
             return True
         # Token overlap fallback: tolerant match for mixed Chinese/English values.
-        user_tokens = set(re.findall(r"[\u4e00-\u9fff]{2,}|[A-Za-z0-9_+-]{2,}", user_text.lower()))
-        cand_tokens = set(re.findall(r"[\u4e00-\u9fff]{2,}|[A-Za-z0-9_+-]{2,}", candidate.lower()))
+        cand_tokens = _VALUE_TOKEN_RE.findall(candidate.lower())
         if not cand_tokens:
             return False
-        return len(user_tokens.intersection(cand_tokens)) > 0
+        if user_tokens is None:
+            user_tokens = set(_VALUE_TOKEN_RE.findall(user_text.lower()))
+        return any(token in user_tokens for token in cand_tokens)
 
     def _format_tool_result_output(self, result: Any, include_severity: bool) -> str:
         if not isinstance(result, ToolResult):
             return str(result)
 
-        output = result.output
+        flag_severity = include_severity and result.severity in _FLAGGED_SEVERITIES
+        if not self._has_result_hints(result, flag_severity):
+            return result.output
+
+        parts = [result.output]
         if result.remedy:
-            output = f"{output}\n\n[系统及工具建议: {result.remedy}]"
-        if include_severity and result.severity in (ToolSeverity.WARN, ToolSeverity.ERROR, ToolSeverity.FATAL):
-            output = f"[severity:{result.severity}]\n{output}"
+            parts.append(f"[系统及工具建议: {result.remedy}]")
         if result.should_retry:
-            output = f"{output}\n\n[系统提示: 建议重试该工具调用，或调整参数后重试。]"
+            parts.append("[系统提示: 建议重试该工具调用，或调整参数后重试。]")
         if result.requires_user_confirmation:
-            output = f"{output}\n\n[系统提示: 该操作需要用户确认后再执行。]"
+            parts.append("[系统提示: 该操作需要用户确认后再执行。]")
+        output = "\n\n".join(parts)
+        if flag_severity:
+            output = f"[severity:{result.severity}]\n{output}"
         return output
 
+    @staticmethod
+    def _has_result_hints(result: ToolResult, flag_severity: bool) -> bool:
+        return bool(result.remedy or flag_severity or result.should_retry or result.requires_user_confirmation)
+
+    def _is_clean_result(self, result: Any, include_severity: bool) -> bool:
+        if isinstance(result, Exception):
+            return False
+        if not isinstance(result, ToolResult):
+            return True
+        flag_severity = include_severity and result.severity in _FLAGGED_SEVERITIES
+        return bool(result.success) and not self._has_result_hints(result, flag_severity)
+
     async def _execute_tool_calls(
         self,
         messages: list[dict[str, Any]],
@@ -578,31 +758,133 @@ class TurnEngine:
         trace_id: str | None,
         include_severity: bool,
         parallel_tool_exec: bool,
+        clean_results: list[bool] | None = None,
+        deadline: float | None = None,
     ) -> list[tuple[str, bool]]:
+        """Run tool calls and append their results; returns (name, success) per call.
+
+        When clean_results is given, it receives one flag per call telling whether
+        the result succeeded with no remedy, retry, confirmation or severity hint.
+        In parallel mode, at most parallel_tool_concurrency calls run at once and
+        each is cut off at the turn deadline (time.monotonic() based) if given.
+        """
         statuses: list[tuple[str, bool]] = []
         if parallel_tool_exec:
-            tool_coros = []
-            tool_starts: dict[str, float] = {}
+            semaphore = asyncio.Semaphore(self.parallel_tool_concurrency)
+
+            async def _run_indexed(index: int, tool_call: ToolCallRequest) -> tuple[int, Any]:
+                async with semaphore:
+                    started = time.monotonic()
+                    timeout = None if deadline is None else max(0.5, deadline - started)
+                    try:
+                        return index, await asyncio.wait_for(
+                            self.executor.execute(tool_call.name, tool_call.arguments),
+                            timeout=timeout,
+                        )
+                    except TimeoutError as e:
+                        # A tool may raise TimeoutError itself; only relabel our own cut-off.
+                        if timeout is not None and time.monotonic() - started >= timeout:
+                            return index, TimeoutError(f"timed out after {timeout:.1f}s")
+                        return index, e
+                    except Exception as e:
+                        return index, e
+
+            # Audit events are written in two batches (starts, ends) rather than one fsync each.
+            start_events = []
             for tool_call in tool_calls:
-                args_str = json.dumps(tool_call.arguments)
                 if trace_id:
-                    logger.debug(f"[TraceID: {trace_id}] Executing tool: {tool_call.name} with arguments: {args_str}")
-                tool_starts[tool_call.id] = time.perf_counter()
-                log_event({
+                    logger.debug(
+                        "[TraceID: {}] Executing tool: {} with arguments: {}",
+                        trace_id,
+                        tool_call.name,
+                        tool_call.arguments_json,
+                    )
+                start_events.append({
                     "type": "tool_start",
                     "trace_id": trace_id,
                     "tool": tool_call.name,
                     "tool_call_id": tool_call.id,
                     "args_keys": list(tool_call.arguments.keys()),
                 })
-                tool_coros.append(self.executor.execute(tool_call.name, tool_call.arguments))
-            results = await asyncio.gather(*tool_coros, return_exceptions=True)
-            for tool_call, result in zip(tool_calls, results):
-                if isinstance(result, Exception):
-                    result_str = f"Error executing tool {tool_call.name}: {str(result)}"
-                    statuses.append((tool_call.name, False))
-                    tool_status = "error"
-                elif isinstance(result, ToolResult):
+            log_events(start_events)
+            # Start times are kept by position, so duplicate call ids cannot collide.
+            tool_starts = [0.0] * len(tool_calls)
+            tasks = []
+            for index, tool_call in enumerate(tool_calls):
+                tool_starts[index] = time.perf_counter()
+                tasks.append(_start_task(_run_indexed(index, tool_call)))
+
+            # Format and log each result as soon as it lands, so a slow tool does not
+            # delay the others; results are still appended in the original call order.
+            ordered: list[tuple[str, bool, str] | None] = [None] * len(tool_calls)
+            clean_flags = [False] * len(tool_calls)
+            end_events: list[dict[str, Any]] = []
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    index, result = await next_done
+                    tool_call = tool_calls[index]
+                    if isinstance(result, Exception):
+                        result_str = f"Error executing tool {tool_call.name}: {str(result)}"
+                        success = False
+                        tool_status = "timeout" if isinstance(result, TimeoutError) else "error"
+                    elif isinstance(result, ToolResult):
+                        result_str = self._format_tool_result_output(result, include_severity=include_severity)
+                        success = bool(result.success)
+                        tool_status = self._classify_tool_status(result, result_str)
+                    else:
+                        result_str = str(result)
+                        success = True
+                        tool_status = "ok"
+                    duration_s = round(time.perf_counter() - tool_starts[index], 4)
+                    end_events.append({
+                        "type": "tool_end",
+                        "trace_id": trace_id,
+                        "tool": tool_call.name,
+                        "tool_call_id": tool_call.id,
+                        "status": tool_status,
+                        "duration_s": duration_s,
+                        "result_len": len(result_str),
+                        "ts": datetime.now(timezone.utc).isoformat(),
+                    })
+                    ordered[index] = (tool_call.name, success, result_str)
+                    if clean_results is not None:
+                        clean_flags[index] = self._is_clean_result(result, include_severity)
+            finally:
+                for task in tasks:
+                    if not task.done():
+                        task.cancel()
+                log_events(end_events)
+
+            batch: list[tuple[str, str, str]] = []
+            for tool_call, entry, clean in zip(tool_calls, ordered, clean_flags):
+                if entry is None:
+                    continue
+                name, success, result_str = entry
+                statuses.append((name, success))
+                batch.append((tool_call.id, name, result_str))
+                if clean_results is not None:
+                    clean_results.append(clean)
+            self.context.add_tool_results(messages, batch)
+            return statuses
+
+        # Audit events for the round are flushed once, even if a tool raises.
+        audit_events: list[dict[str, Any]] = []
+        try:
+            for tool_call in tool_calls:
+                logger.debug("Executing tool: {} with arguments: {}", tool_call.name, tool_call.arguments_json)
+                started = time.perf_counter()
+                audit_events.append({
+                    "type": "tool_start",
+                    "trace_id": trace_id,
+                    "tool": tool_call.name,
+                    "tool_call_id": tool_call.id,
+                    "args_keys": list(tool_call.arguments.keys()),
+                    "ts": datetime.now(timezone.utc).isoformat(),
+                })
+                result = await self.executor.execute(tool_call.name, tool_call.arguments)
+                if clean_results is not None:
+                    clean_results.append(self._is_clean_result(result, include_severity))
+                if isinstance(result, ToolResult):
                     result_str = self._format_tool_result_output(result, include_severity=include_severity)
                     statuses.append((tool_call.name, bool(result.success)))
                     tool_status = self._classify_tool_status(result, result_str)
@@ -610,10 +892,8 @@ class TurnEngine:
                     result_str = str(result)
                     statuses.append((tool_call.name, True))
                     tool_status = "ok"
-                duration_s = None
-                if tool_call.id in tool_starts:
-                    duration_s = round(float(time.perf_counter() - tool_starts[tool_call.id]), 4)
-                log_event({
+                duration_s = round(float(time.perf_counter() - started), 4)
+                audit_events.append({
                     "type": "tool_end",
                     "trace_id": trace_id,
                     "tool": tool_call.name,
@@ -621,41 +901,11 @@ class TurnEngine:
                     "status": tool_status,
                     "duration_s": duration_s,
                     "result_len": len(result_str),
+                    "ts": datetime.now(timezone.utc).isoformat(),
                 })
                 self.context.add_tool_result(messages, tool_call.id, tool_call.name, result_str)
-            return statuses
-
-        for tool_call in tool_calls:
-            args_str = json.dumps(tool_call.arguments)
-            logger.debug(f"Executing tool: {tool_call.name} with arguments: {args_str}")
-            started = time.perf_counter()
-            log_event({
-                "type": "tool_start",
-                "trace_id": trace_id,
-                "tool": tool_call.name,
-                "tool_call_id": tool_call.id,
-                "args_keys": list(tool_call.arguments.keys()),
-            })
-            result = await self.executor.execute(tool_call.name, tool_call.arguments)
-            if isinstance(result, ToolResult):
-                result_str = self._format_tool_result_output(result, include_severity=include_severity)
-                statuses.append((tool_call.name, bool(result.success)))
-                tool_status = self._classify_tool_status(result, result_str)
-            else:
-                result_str = str(result)
-                statuses.append((tool_call.name, True))
-                tool_status = "ok"
-            duration_s = round(float(time.perf_counter() - started), 4)
-            log_event({
-                "type": "tool_end",
-                "trace_id": trace_id,
-                "tool": tool_call.name,
-                "tool_call_id": tool_call.id,
-                "status": tool_status,
-                "duration_s": duration_s,
-                "result_len": len(result_str),
-            })
-            self.context.add_tool_result(messages, tool_call.id, tool_call.name, result_str)
+        finally:
+            log_events(audit_events)
         return statuses
 
     def _classify_tool_status(self, result: ToolResult, result_text: str) -> str:
@@ -667,29 +917,118 @@ class TurnEngine:
         return "error"
 
     async def _compact_messages_if_needed(self, messages: list[dict[str, Any]], trace_id: str | None) -> None:
-        guard = ContextGuard(model=self.model)
+        keep_recent = self.COMPACT_KEEP_RECENT
+        if len(messages) <= keep_recent:
+            # Nothing older than the recent window to summarize; skip token counting.
+            return
+        guard = self._context_guard
+        if not guard.may_need_compaction(messages):
+            return
         evaluation = guard.evaluate(messages)
         if not evaluation["should_compact"]:
             return
 
         if trace_id:
-            logger.info(f"[TraceID: {trace_id}] Context utilization high ({evaluation['utilization']:.2f}). Triggering compaction...")
-        keep_recent = 10
-        to_sum = [m for m in messages if m.get("role") != "system"]
-        if len(to_sum) <= keep_recent:
+            logger.info(
+                "[TraceID: {}] Context utilization high ({:.2f}). Triggering compaction...",
+                trace_id,
+                evaluation["utilization"],
+            )
+        # One pass: length of the leading system block and count of non-system messages.
+        prefix_end = 0
+        non_system_count = 0
+        for i, m in enumerate(messages):
+            if m.get("role") == "system":
+                if prefix_end == i:
+                    prefix_end += 1
+            else:
+                non_system_count += 1
+        if non_system_count <= keep_recent:
             return
-        prefix_msgs = [m for m in messages if m.get("role") == "system"]
-        sum_msgs = messages[len(prefix_msgs):-keep_recent]
+        prefix_msgs = messages[:prefix_end]
+        user_text = self._latest_user_text(messages)
+        # Mid-stream system injections (self-correction hints) are transient; don't summarize them.
+        sum_msgs = [m for m in messages[prefix_end:-keep_recent] if m.get("role") != "system"]
         recent_msgs = messages[-keep_recent:]
-        summary = await self.summarize_messages(sum_msgs)
+        summary = None
+        try:
+            summary = await asyncio.wait_for(
+                self.summarize_messages(sum_msgs), timeout=self.COMPACT_SUMMARY_TIMEOUT_SECONDS
+            )
+        except Exception as e:
+            logger.warning("Compaction summary unavailable ({}); using deterministic summary.", str(e) or type(e).__name__)
+        if not summary:
+            summary = self._deterministic_summary(sum_msgs)
         if not summary:
             return
-        new_prefix = []
-        for m in prefix_msgs:
-            content = m.get("content", "")
-            if isinstance(content, str) and "Previous conversation summary:" in content:
-                continue
-            new_prefix.append(m)
-        messages[:] = new_prefix + [{"role": "system", "content": f"Previous conversation summary: {summary}"}] + recent_msgs
+        new_prefix = [
+            m
+            for m in prefix_msgs
+            if not str(m.get("content", "")).startswith("Previous conversation summary:")
+        ]
+        pinned = self._select_pinned_messages(sum_msgs, user_text)
+        messages[:] = (
+            new_prefix
+            + [{"role": "system", "content": f"Previous conversation summary: {summary}"}]
+            + pinned
+            + recent_msgs
+        )
         if trace_id:
-            logger.info(f"[TraceID: {trace_id}] Context compacted via LLM summary (and deduped).")
+            logger.info("[TraceID: {}] Context compacted via LLM summary (and deduped).", trace_id)
+
+    def _select_pinned_messages(self, messages: list[dict[str, Any]], query: str) -> list[dict[str, Any]]:
+        """Pick the older messages most relevant to the current ask, in original order.
+
+        Relevance is token overlap with the query plus a small recency bonus. Only
+        plain user/assistant text is eligible, so tool-call/result pairs stay intact.
+        """
+        query_tokens = set(_VALUE_TOKEN_RE.findall(query.lower()))
+        if not query_tokens or self.COMPACT_PINNED_MESSAGES <= 0:
+            return []
+        n = len(messages)
+        scored: list[tuple[float, int]] = []
+        for i, m in enumerate(messages):
+            role = m.get("role")
+            content = m.get("content")
+            if role not in ("user", "assistant") or m.get("tool_calls"):
+                continue
+            if not isinstance(content, str) or not content or len(content) > self.COMPACT_PIN_MAX_CHARS:
+                continue
+            overlap = len(query_tokens.intersection(_VALUE_TOKEN_RE.findall(content.lower())))
+            if not overlap:
+                continue
+            score = overlap / len(query_tokens) + self.COMPACT_PIN_RECENCY_WEIGHT * (i + 1) / n
+            scored.append((score, i))
+        top = sorted(scored, reverse=True)[: self.COMPACT_PINNED_MESSAGES]
+        return [messages[i] for _score, i in sorted(top, key=lambda item: item[1])]
+
+    def _deterministic_summary(self, messages: list[dict[str, Any]]) -> str:
+        """Summarize without an LLM: recent user asks, assistant topics and tools used."""
+        user_lines: list[str] = []
+        topics: dict[str, None] = {}
+        tools: set[str] = set()
+        for m in messages:
+            role = m.get("role")
+            content = m.get("content")
+            first_line = content.strip().split("\n", 1)[0][:80] if isinstance(content, str) else ""
+            if role == "user":
+                if first_line:
+                    user_lines.append(first_line)
+            elif role == "assistant":
+                if first_line:
+                    topics[first_line] = None
+                for tc in m.get("tool_calls") or []:
+                    name = (tc.get("function") or {}).get("name") if isinstance(tc, dict) else None
+                    if name:
+                        tools.add(str(name))
+            elif role == "tool":
+                tools.add(str(m.get("name", "unknown")))
+
+        parts: list[str] = []
+        if user_lines:
+            parts.append(f"用户消息 {len(user_lines)} 条，最近诉求：{' | '.join(user_lines[-5:])}")
+        if topics:
+            parts.append(f"助手已回复：{' | '.join(list(topics)[-5:])}")
+        if tools:
+            parts.append(f"使用过的工具：{', '.join(sorted(tools))}")
+        return "；".join(parts)
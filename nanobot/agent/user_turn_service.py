@@ -1,4 +1,5 @@
 from typing import Callable
+import asyncio
 import re
 
 from loguru import logger
@@ -8,7 +9,37 @@ from nanobot.agent.tools.message import MessageTool
 from nanobot.bus.events import InboundMessage, OutboundMessage
 from nanobot.session.manager import Session
 from nanobot.session.manager import SessionManager
-from nanobot.agent.honesty import audit_and_mark_hallucinations
+from nanobot.agent.honesty import mark_unexecuted_claim, narrow_to_content, unexecuted_tool_aliases
+
+_DROPPED_HEADER_PREFIXES = ("查询来源", "联网策略")
+_HEADER_COLONS = (":", "：")
+
+_SOURCE_MAP = {
+    "train_ticket": "12306",
+    "github": "GitHub",
+    "tavily": "Tavily API",
+    "mcp:amap": "高德地图",
+    "mcp:12306": "12306",
+    "mcp:github": "GitHub",
+    "mcp:puppeteer": "Browser",
+    "browser": "Browser",
+    "weather": "和风天气 API",
+    "tianapi": "天行 API",
+    "tushare": "Tushare API",
+}
+_COMPLETION_RE = re.compile(r"已完成|已经完成|处理完成|执行完成|已处理完")
+
+
+def _has_source_header_prefix(content: str) -> bool:
+    return any(prefix in content for prefix in _DROPPED_HEADER_PREFIXES)
+
+
+def _is_source_header(line: str) -> bool:
+    stripped = line.lstrip()
+    if not stripped.startswith(_DROPPED_HEADER_PREFIXES):
+        return False
+    # Both prefixes are four characters; accept ASCII or full-width colons.
+    return stripped[4:].lstrip().startswith(_HEADER_COLONS)
 
 
 class UserTurnService:
@@ -24,6 +55,7 @@ class UserTurnService:
         compact_history: Callable[[Session], object],
         filter_reasoning: Callable[[str], str],
         is_silent_reply: Callable[[str], bool],
+        history_fits_context: Callable[[Session], bool] | None = None,
     ) -> None:
         self.sessions = sessions
         self.context = context
@@ -32,15 +64,29 @@ class UserTurnService:
         self.compact_history = compact_history
         self.filter_reasoning = filter_reasoning
         self.is_silent_reply = is_silent_reply
+        self.history_fits_context = history_fits_context
+        # The engine and registry are fixed for the service's lifetime; resolve optional hooks once.
+        pop_used = getattr(turn_engine, "pop_used_tools", None)
+        pop_report = getattr(turn_engine, "pop_execution_report", None)
+        self._pop_used_tools_fn = pop_used if callable(pop_used) else None
+        self._pop_report_fn = pop_report if callable(pop_report) else None
+        get_meta = getattr(tools, "get_all_metadata", None)
+        self._get_tools_meta_fn = get_meta if callable(get_meta) else None
 
     async def process(self, msg: InboundMessage) -> OutboundMessage | None:
         if msg.trace_id:
-            logger.info(f"[TraceID: {msg.trace_id}] Processing message from {msg.channel}:{msg.sender_id}")
+            logger.info("[TraceID: {}] Processing message from {}:{}", msg.trace_id, msg.channel, msg.sender_id)
         else:
-            logger.info(f"Processing message from {msg.channel}:{msg.sender_id}")
+            logger.info("Processing message from {}:{}", msg.channel, msg.sender_id)
 
         session = self.sessions.get_or_create(msg.session_key)
-        await self.compact_history(session)
+        compaction: asyncio.Future | None = None
+        if self.history_fits_context is not None and self.history_fits_context(session):
+            # History already fits this request, so proactive summarization can
+            # overlap with the turn instead of delaying the first model call.
+            compaction = asyncio.ensure_future(self.compact_history(session))
+        else:
+            await self.compact_history(session)
 
         message_tool = self.tools.get("message")
         if isinstance(message_tool, MessageTool):
@@ -62,33 +108,49 @@ class UserTurnService:
             chat_id=msg.chat_id,
         )
 
-        final_content = await self.turn_engine.run(
-            messages=messages,
-            trace_id=msg.trace_id,
-            parse_calls_from_text=True,
-            include_severity=True,
-            parallel_tool_exec=True,
-            compact_after_tools=True,
-        )
-
-        if final_content is None:
-            final_content = "我已经完成了处理，但暂时没有需要回复的具体内容。"
+        try:
+            final_content = await self.turn_engine.run(
+                messages=messages,
+                trace_id=msg.trace_id,
+                parse_calls_from_text=True,
+                include_severity=True,
+                parallel_tool_exec=True,
+                compact_after_tools=True,
+            )
+        finally:
+            # Compaction rewrites session.messages; it must land before this turn appends.
+            if compaction is not None:
+                try:
+                    await compaction
+                except Exception as e:
+                    logger.warning(f"Background history compaction failed: {e}")
 
-        final_content = self.filter_reasoning(str(final_content))
         used_tools = self._pop_used_tools(msg.trace_id)
         exec_report = self._pop_execution_report(msg.trace_id)
+        hallucination_detected = False
+
+        if final_content is None or not str(final_content).strip():
+            # Canned replies have nothing to sanitize; only the execution-truth check applies.
+            fallback = (
+                "我已经完成了处理，但暂时没有需要回复的具体内容。"
+                if final_content is None
+                else "本次未产出有效结果，可能模型或工具链暂时不可用。请重试一次。"
+            )
+            final_content = self._enforce_execution_truth(fallback, exec_report)
+        else:
+            final_content = self.filter_reasoning(str(final_content))
 
-        # 诚信审计：检测并标记动作幻觉 (Hallucination Policing)
-        all_tools_meta = self.tools.get_all_metadata() if hasattr(self.tools, "get_all_metadata") else []
-        final_content, hallucination_detected = audit_and_mark_hallucinations(
-            final_content, used_tools, all_tools_meta
-        )
+            # 诚信审计：检测并标记动作幻觉 (Hallucination Policing)
+            all_tools_meta = self._get_tools_meta_fn() if self._get_tools_meta_fn is not None else []
+            final_content, hallucination_detected = self._sanitize(
+                final_content, frozenset(used_tools), all_tools_meta
+            )
 
-        final_content = self._enforce_execution_truth(final_content, exec_report)
-        final_content = self._add_query_source_line(final_content, used_tools)
+            final_content = self._enforce_execution_truth(final_content, exec_report)
+            final_content = self._add_query_source_line(final_content, used_tools)
 
-        if final_content.strip() == "":
-            final_content = "本次未产出有效结果，可能模型或工具链暂时不可用。请重试一次。"
+            if final_content.strip() == "":
+                final_content = "本次未产出有效结果，可能模型或工具链暂时不可用。请重试一次。"
 
         session.add_message("user", msg.content)
 
@@ -113,59 +175,50 @@ class UserTurnService:
         )
 
     def _pop_used_tools(self, trace_id: str | None) -> list[str]:
-        pop_fn = getattr(self.turn_engine, "pop_used_tools", None)
-        if not callable(pop_fn):
+        if self._pop_used_tools_fn is None:
             return []
-        return pop_fn(trace_id)
+        return self._pop_used_tools_fn(trace_id)
 
     def _pop_execution_report(self, trace_id: str | None) -> dict:
-        pop_fn = getattr(self.turn_engine, "pop_execution_report", None)
-        if not callable(pop_fn):
+        if self._pop_report_fn is None:
             return {}
-        report = pop_fn(trace_id)
+        report = self._pop_report_fn(trace_id)
         return report if isinstance(report, dict) else {}
 
-    def _add_query_source_line(self, content: str, tools: list[str]) -> str:
-        body = self._strip_source_headers(content)
+    def _add_query_source_line(self, body: str, tools: list[str]) -> str:
+        """Prefix the system-owned '查询来源:' line; `body` must already be sanitized."""
         if not tools:
             return body
-        source_map = {
-            "train_ticket": "12306",
-            "github": "GitHub",
-            "tavily": "Tavily API",
-            "mcp:amap": "高德地图",
-            "mcp:12306": "12306",
-            "mcp:github": "GitHub",
-            "mcp:puppeteer": "Browser",
-            "browser": "Browser",
-            "weather": "和风天气 API",
-            "tianapi": "天行 API",
-            "tushare": "Tushare API",
-        }
-        sources: list[str] = []
-        for t in tools:
-            src = source_map.get(t)
-            if src and src not in sources:
-                sources.append(src)
+        sources = list(dict.fromkeys(s for s in map(_SOURCE_MAP.get, tools) if s))
         if not sources:
             return body
         return f"查询来源: {' + '.join(sources)}\n\n{body}"
 
-    def _strip_source_headers(self, content: str) -> str:
+    def _sanitize(self, content: str, used: frozenset[str], all_tools_meta: list[dict]) -> tuple[str, bool]:
         """
-        Keep source headers system-owned:
-        - Drop model-generated '查询来源:' and '联网策略:' lines.
-        - The final '查询来源:' is injected only from actual used tools.
+        Single pass over the reply lines:
+        - Drop model-generated '查询来源:' and '联网策略:' lines; the final
+          '查询来源:' is injected only from actually used tools.
+        - Strike through claims about tools that were not executed.
+        Returns (sanitized_content, hallucination_detected).
         """
-        lines = content.splitlines()
-        normalized: list[str] = []
-        for line in lines:
-            if re.match(r"^\s*查询来源\s*:", line):
-                continue
-            if re.match(r"^\s*联网策略\s*:", line):
+        # Whole-reply substring scans rule out per-line work; clean replies skip the loop entirely.
+        unused_aliases = narrow_to_content(content, unexecuted_tool_aliases(used, all_tools_meta))
+        drop_headers = _has_source_header_prefix(content)
+        if not unused_aliases and not drop_headers:
+            return content.strip(), False
+        hallucination_detected = False
+        kept: list[str] = []
+        for line in content.splitlines():
+            if drop_headers and _is_source_header(line):
                 continue
-            normalized.append(line)
-        return "\n".join(normalized).strip()
+            marked = mark_unexecuted_claim(line, unused_aliases)
+            if marked is not None:
+                hallucination_detected = True
+                kept.append(marked)
+            else:
+                kept.append(line)
+        return "\n".join(kept).strip(), hallucination_detected
 
     def _enforce_execution_truth(self, content: str, report: dict) -> str:
         total = int(report.get("total_tool_calls", 0) or 0)
@@ -175,7 +228,7 @@ class UserTurnService:
             return content
 
         text = (content or "").strip()
-        completion_claim = re.search(r"(已完成|已经完成|处理完成|执行完成|已处理完)", text)
+        completion_claim = _COMPLETION_RE.search(text)
         if success == 0:
             # 所有工具均失败时，禁止“已完成”话术，避免对用户造成误导。
             return (
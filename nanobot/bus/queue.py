@@ -23,12 +23,19 @@ class MessageBus:
             str, list[Callable[[OutboundMessage], Awaitable[None]]]
         ] = {}
         self._running = False
+        self._dispatch_task: asyncio.Task | None = None
 
     async def publish_inbound(self, msg: InboundMessage, timeout: float = 5.0) -> bool:
         """
         Publish a message from a channel to the agent.
         Returns True if published, False if queue is full after timeout.
         """
+        try:
+            # Common case: there is room, so skip the wait_for task and timer.
+            self.inbound.put_nowait(msg)
+            return True
+        except asyncio.QueueFull:
+            pass
         try:
             await asyncio.wait_for(self.inbound.put(msg), timeout=timeout)
             return True
@@ -45,6 +52,12 @@ class MessageBus:
         Publish a response from the agent to channels.
         Returns True if published, False if queue is full after timeout.
         """
+        try:
+            # Common case: there is room, so skip the wait_for task and timer.
+            self.outbound.put_nowait(msg)
+            return True
+        except asyncio.QueueFull:
+            pass
         try:
             await asyncio.wait_for(self.outbound.put(msg), timeout=timeout)
             return True
@@ -70,15 +83,19 @@ class MessageBus:
         Run this as a background task.
         """
         self._running = True
-        while self._running:
-            try:
-                msg = await asyncio.wait_for(self.outbound.get(), timeout=1.0)
+        self._dispatch_task = asyncio.current_task()
+        try:
+            while self._running:
+                # Block without a poll timeout; stop() cancels this task to end the loop.
+                msg = await self.outbound.get()
                 subscribers = self._outbound_subscribers.get(msg.channel, [])
                 for callback in subscribers:
                     # Execute callbacks as independent tasks to prevent a slow channel from blocking the bus
                     asyncio.create_task(self._safe_dispatch(callback, msg))
-            except asyncio.TimeoutError:
-                continue
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._dispatch_task = None
 
     async def _safe_dispatch(self, callback: Callable[[OutboundMessage], Awaitable[None]], msg: OutboundMessage):
         """Helper to run callback with error handling and timeout."""
@@ -93,6 +110,8 @@ class MessageBus:
     def stop(self) -> None:
         """Stop the dispatcher loop."""
         self._running = False
+        if self._dispatch_task is not None:
+            self._dispatch_task.cancel()
 
     @property
     def inbound_size(self) -> int:
@@ -1,7 +1,6 @@
 """iMessage channel implementation using local imsg CLI."""
 
 import asyncio
-import json
 import subprocess
 from typing import Any
 
@@ -11,6 +10,7 @@ from nanobot.bus.events import InboundMessage, OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
 from nanobot.config.schema import ImessageConfig
+from nanobot.utils import json_codec
 
 
 class ImessageChannel(BaseChannel):
@@ -22,11 +22,20 @@ class ImessageChannel(BaseChannel):
     """
 
     name = "imessage"
+    # Cap on one buffered record; read(n) below ignores the subprocess pipe limit.
+    MAX_RECORD_BYTES = 1 << 20
+    READ_CHUNK_BYTES = 1 << 16
+    SEND_ACK_TIMEOUT_SECONDS = 30.0
 
     def __init__(self, config: ImessageConfig, bus: MessageBus):
         super().__init__(config, bus)
         self.config: ImessageConfig = config
         self._process: asyncio.subprocess.Process | None = None
+        # Persistent sender (see ImessageConfig.send_stream_command); respawned on demand if it dies.
+        self._send_proc: asyncio.subprocess.Process | None = None
+        self._send_stderr_task: asyncio.Task | None = None
+        self._send_lock = asyncio.Lock()
+        self._stream_disabled = False
 
     async def start(self) -> None:
         """Start watching for iMessages using 'imsg watch --json'."""
@@ -38,25 +47,35 @@ class ImessageChannel(BaseChannel):
             self._process = await asyncio.create_subprocess_exec(
                 "imsg", "watch", "--json",
                 stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+                stderr=asyncio.subprocess.PIPE,
             )
             
             logger.info("iMessage watch process started")
             
-            # Read JSON objects from stdout line by line
+            # Read stdout in chunks and split out every complete JSON line per wakeup,
+            # so bursts cost one event-loop hop instead of one per message.
+            pending = b""
+            # Set while discarding the tail of an oversized record up to its newline.
+            skipping = False
             while self._running and self._process.stdout:
-                line = await self._process.stdout.readline()
-                if not line:
+                chunk = await self._process.stdout.read(self.READ_CHUNK_BYTES)
+                if not chunk:
                     break
-                
-                try:
-                    data = json.loads(line.decode().strip())
-                    await self._process_incoming_message(data)
-                except json.JSONDecodeError:
-                    if line.strip():
-                        logger.warning(f"Failed to decode iMessage JSON: {line.decode()}")
-                except Exception as e:
-                    logger.error(f"Error processing iMessage: {e}")
+                *lines, pending = (pending + chunk).split(b"\n")
+                if lines and skipping:
+                    lines = lines[1:]
+                    skipping = False
+                for line in lines:
+                    if len(line) > self.MAX_RECORD_BYTES:
+                        self._warn_oversized_record()
+                        continue
+                    await self._handle_watch_line(line)
+                if len(pending) > self.MAX_RECORD_BYTES:
+                    self._warn_oversized_record()
+                    pending = b""
+                    skipping = True
+            if pending and not skipping:
+                await self._handle_watch_line(pending)
 
         except Exception as e:
             logger.exception(f"CRITICAL: iMessage initialization failed: {e}")
@@ -64,6 +83,23 @@ class ImessageChannel(BaseChannel):
         finally:
             await self.stop()
 
+    def _warn_oversized_record(self) -> None:
+        logger.warning(f"Dropping oversized iMessage record (over {self.MAX_RECORD_BYTES} bytes)")
+
+    async def _handle_watch_line(self, line: bytes) -> None:
+        """Decode one `imsg watch --json` line and forward it."""
+        try:
+            # Bytes go straight to the decoder (orjson when installed); JSON whitespace is tolerated.
+            data = json_codec.loads(line)
+        except ValueError:
+            if line.strip():
+                logger.warning(f"Failed to decode iMessage JSON: {line.decode(errors='replace')}")
+            return
+        try:
+            await self._process_incoming_message(data)
+        except Exception as e:
+            logger.error(f"Error processing iMessage: {e}")
+
     async def stop(self) -> None:
         """Stop the iMessage watch process."""
         self._running = False
@@ -75,32 +111,126 @@ class ImessageChannel(BaseChannel):
             except Exception as e:
                 logger.error(f"Error stopping iMessage process: {e}")
             self._process = None
+        await self._close_send_stream()
+
+    async def _close_send_stream(self, graceful: bool = True) -> None:
+        proc, self._send_proc = self._send_proc, None
+        stderr_task, self._send_stderr_task = self._send_stderr_task, None
+        if proc is None:
+            return
+        if proc.stdin:
+            proc.stdin.close()
+        if proc.returncode is None:
+            try:
+                if not graceful:
+                    # Acks are matched by order, so a helper that missed one cannot be reused.
+                    proc.kill()
+                await asyncio.wait_for(proc.wait(), timeout=5.0)
+            except ProcessLookupError:
+                pass
+            except Exception:
+                proc.kill()
+                await proc.wait()
+        if stderr_task is not None:
+            # Drains to EOF once the helper has exited.
+            try:
+                await asyncio.wait_for(stderr_task, timeout=1.0)
+            except Exception:
+                stderr_task.cancel()
+
+    async def _ensure_send_stream(self) -> asyncio.subprocess.Process | None:
+        """Return a live streaming sender, spawning it if configured and not running."""
+        if self._stream_disabled or not self.config.send_stream_command:
+            return None
+        if self._send_proc is not None and self._send_proc.returncode is None:
+            return self._send_proc
+        # Reap a helper that exited on its own before spawning its replacement.
+        await self._close_send_stream()
+        try:
+            self._send_proc = await asyncio.create_subprocess_exec(
+                *self.config.send_stream_command,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            self._send_stderr_task = asyncio.create_task(self._log_send_stream_stderr(self._send_proc))
+        except OSError as e:
+            # A missing binary will not fix itself; stay on per-message sends.
+            logger.error(f"iMessage send stream unavailable, using per-message sends: {e}")
+            self._stream_disabled = True
+            self._send_proc = None
+        return self._send_proc
+
+    async def _log_send_stream_stderr(self, proc: asyncio.subprocess.Process) -> None:
+        """Surface the persistent sender's diagnostics instead of discarding them."""
+        if proc.stderr is None:
+            return
+        async for line in proc.stderr:
+            logger.warning(f"iMessage send stream: {line.decode(errors='replace').rstrip()}")
+
+    async def _send_via_stream(self, recipient: str, text: str) -> bool:
+        """
+        Write one message to the persistent sender and wait for its ack line.
+        Returns False if the message must go through the per-message path instead.
+        """
+        async with self._send_lock:
+            proc = await self._ensure_send_stream()
+            if proc is None or proc.stdin is None or proc.stdout is None:
+                return False
+            try:
+                proc.stdin.write(json_codec.dumps_bytes({"to": recipient, "text": text}) + b"\n")
+                await proc.stdin.drain()
+                ack_line = await asyncio.wait_for(
+                    proc.stdout.readline(), timeout=self.SEND_ACK_TIMEOUT_SECONDS
+                )
+            except (BrokenPipeError, ConnectionResetError, asyncio.TimeoutError) as e:
+                logger.warning(f"iMessage send stream failed, falling back to imsg send: {e!r}")
+                await self._close_send_stream(graceful=False)
+                return False
+            if not ack_line:
+                logger.warning("iMessage send stream exited without an ack, falling back to imsg send")
+                await self._close_send_stream(graceful=False)
+                return False
+            try:
+                ack = json_codec.loads(ack_line)
+            except ValueError:
+                ack = None
+            if isinstance(ack, dict) and ack.get("ok") is True:
+                return True
+            error = ack.get("error") if isinstance(ack, dict) else ack_line.decode(errors="replace").strip()
+            logger.warning(f"iMessage send stream rejected message, falling back to imsg send: {error}")
+            return False
 
     async def send(self, msg: OutboundMessage) -> None:
-        """Send a message via 'imsg send'."""
+        """Send a message via the persistent sender when configured, else 'imsg send'."""
         try:
             # We use the identifier (phone/email) to send
             recipient = msg.chat_id
             
             logger.info(f"Sending iMessage to {recipient}")
-            
-            # Run imsg send
-            process = await asyncio.create_subprocess_exec(
-                "imsg", "send", "--to", recipient, "--text", msg.content,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await process.communicate()
-            
-            if process.returncode != 0:
-                logger.error(f"Failed to send iMessage: {stderr.decode()}")
-            else:
-                logger.info(f"iMessage sent successfully to {recipient}")
+
+            if await self._send_via_stream(recipient, msg.content):
+                return
+            await self._send_via_cli(recipient, msg.content)
 
         except Exception as e:
             logger.error(f"Error sending iMessage: {e}")
 
+    async def _send_via_cli(self, recipient: str, text: str) -> None:
+        """Send one message with a dedicated 'imsg send' subprocess."""
+        process = await asyncio.create_subprocess_exec(
+            "imsg", "send", "--to", recipient, "--text", text,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+
+        stdout, stderr = await process.communicate()
+
+        if process.returncode != 0:
+            logger.error(f"Failed to send iMessage: {stderr.decode()}")
+        else:
+            logger.info(f"iMessage sent successfully to {recipient}")
+
     async def _process_incoming_message(self, data: dict[str, Any]) -> None:
         """Parse imsg JSON output and forward to bus."""
         # Example JSON from imsg watch:
@@ -129,7 +129,8 @@ class ChannelManager:
 
         while True:
             try:
-                msg = await asyncio.wait_for(self.bus.consume_outbound(), timeout=1.0)
+                # Block without a poll timeout; stop_all() cancels this task.
+                msg = await self.bus.consume_outbound()
                 logger.debug(f"[TraceID: {msg.trace_id}] Dispatcher dequeued message for channel: {msg.channel}")
 
                 channel = self.channels.get(msg.channel)
@@ -147,8 +148,6 @@ class ChannelManager:
                 else:
                     logger.warning(f"[TraceID: {msg.trace_id}] Unknown channel: {msg.channel}. Dropping message.")
 
-            except asyncio.TimeoutError:
-                continue
             except asyncio.CancelledError:
                 break
 
@@ -1,10 +1,13 @@
 """Telegram channel implementation using python-telegram-bot."""
 
 import asyncio
-from datetime import datetime
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import lru_cache
 
 from loguru import logger
 from telegram import BotCommand, Update
+from telegram.error import RetryAfter
 from telegram.ext import (
     Application,
     CommandHandler,
@@ -24,6 +27,61 @@ from nanobot.runtime.failures import list_recent_failures
 from nanobot.session.service import SessionService
 from nanobot.utils.helpers import get_data_path
 
+# We use a conservative segment limit of 3500 to leave room for HTML tags
+_SEGMENT_LIMIT = 3500
+
+
+def _retry_delay(error: Exception, default: float) -> float:
+    """Seconds to wait before retrying; a rate limit tells us exactly how long."""
+    if isinstance(error, RetryAfter):
+        retry_after = error.retry_after
+        if isinstance(retry_after, timedelta):
+            return retry_after.total_seconds()
+        return float(retry_after)
+    return default
+
+
+# Both conversions are pure, so repeated content (retries, broadcasts, canned replies)
+# reuses earlier results; maxsize bounds the memory held.
+@lru_cache(maxsize=1024)
+def _md_to_html_cached(segment: str) -> str:
+    return markdown_to_telegram_html(segment)
+
+
+@lru_cache(maxsize=256)
+def _split_cached(content: str) -> tuple[str, ...]:
+    return tuple(split_message(content, limit=_SEGMENT_LIMIT))
+
+
+# BotCommand is immutable, so one shared tuple serves every start/restart.
+_BOT_COMMANDS = (
+    BotCommand("start", "开始使用"),
+    BotCommand("help", "查看可用命令"),
+    BotCommand("status", "查看机器人状态"),
+    BotCommand("failures", "查看近期失败事件"),
+    BotCommand("diagnose", "诊断近期失败事件"),
+    BotCommand("history", "查看会话历史"),
+    BotCommand("use", "切换到指定会话"),
+    BotCommand("new", "开启新会话"),
+    BotCommand("clear", "清空当前会话"),
+    BotCommand("undo", "回退上一轮对话"),
+)
+_START_TEMPLATE = "你好 {first_name}，我是 nanobot。\n\n直接发消息即可，我会处理并回复。输入 /help 查看命令。"
+_HELP_TEXT = (
+    "可用命令:\n"
+    "/start - 开始使用\n"
+    "/help - 查看命令说明\n"
+    "/status - 查看机器人状态\n"
+    "/failures - 查看近期失败事件\n"
+    "/diagnose - 诊断近期失败事件\n"
+    "/history - 查看会话历史\n"
+    "/use <session_key> - 切换到指定会话\n"
+    "/new - 开启新会话\n"
+    "/clear - 清空当前会话\n"
+    "/undo - 回退上一轮对话"
+)
+
+
 class TelegramChannel(BaseChannel):
     """
     Telegram channel using long polling.
@@ -32,14 +90,19 @@ class TelegramChannel(BaseChannel):
     """
 
     name = "telegram"
+    SEND_ATTEMPTS = 3
+    SEND_RETRY_DELAY = 1.0
+    CHAT_ID_CACHE_MAX_ENTRIES = 10_000
 
     def __init__(self, config: TelegramConfig, bus: MessageBus, groq_api_key: str = ""):
         super().__init__(config, bus)
         self.config: TelegramConfig = config
         self.groq_api_key = groq_api_key
         self._app: Application | None = None
-        self._chat_ids: dict[str, int] = {}  # Map sender_id to chat_id for replies
+        # Map sender_id to chat_id for replies; LRU-bounded so long-running bots don't grow forever
+        self._chat_ids: OrderedDict[str, int] = OrderedDict()
         self._session_service = SessionService(channel_name=self.name)
+        self._stop_event = asyncio.Event()
 
     async def start(self) -> None:
         """Start the Telegram bot with long polling."""
@@ -50,6 +113,7 @@ class TelegramChannel(BaseChannel):
                 return
 
             self._running = True
+            self._stop_event.clear()
 
             # Build the application with robust request settings
             logger.info("Setting up HTTPXRequest...")
@@ -105,20 +169,7 @@ class TelegramChannel(BaseChannel):
             logger.info("Fetching Telegram bot info (getMe)...")
             bot_info = await asyncio.wait_for(self._app.bot.get_me(), timeout=30.0)
             logger.info(f"Telegram bot @{bot_info.username} connected")
-            await self._app.bot.set_my_commands(
-                [
-                    BotCommand("start", "开始使用"),
-                    BotCommand("help", "查看可用命令"),
-                    BotCommand("status", "查看机器人状态"),
-                    BotCommand("failures", "查看近期失败事件"),
-                    BotCommand("diagnose", "诊断近期失败事件"),
-                    BotCommand("history", "查看会话历史"),
-                    BotCommand("use", "切换到指定会话"),
-                    BotCommand("new", "开启新会话"),
-                    BotCommand("clear", "清空当前会话"),
-                    BotCommand("undo", "回退上一轮对话"),
-                ]
-            )
+            await self._app.bot.set_my_commands(_BOT_COMMANDS)
 
             # Start polling (this runs until stopped)
             logger.info("Starting long polling...")
@@ -127,9 +178,8 @@ class TelegramChannel(BaseChannel):
                 drop_pending_updates=False,
             )
 
-            # Keep running until stopped
-            while self._running:
-                await asyncio.sleep(1)
+            # Keep running until stop() sets the event; no periodic wakeups while idle
+            await self._stop_event.wait()
 
         except Exception as e:
             logger.exception(f"CRITICAL: Telegram initialization failed: {e}")
@@ -143,6 +193,7 @@ class TelegramChannel(BaseChannel):
     async def stop(self) -> None:
         """Stop the Telegram bot."""
         self._running = False
+        self._stop_event.set()
 
         if self._app:
             logger.info("Stopping Telegram bot...")
@@ -160,64 +211,57 @@ class TelegramChannel(BaseChannel):
         try:
             chat_id = int(msg.chat_id)
             # 1. Segment the message if it's too long
-            # We use a conservative limit of 3500 to leave room for HTML tags
-            segments = split_message(msg.content, limit=3500)
-            
+            segments = _split_cached(msg.content)
             for i, segment in enumerate(segments):
-                # Convert markdown to Telegram HTML for each segment
-                html_content = markdown_to_telegram_html(segment)
-                
-                # Basic retry logic for transient network issues
-                for attempt in range(3):
-                    try:
-                        await self._app.bot.send_message(
-                            chat_id=chat_id, 
-                            text=html_content, 
-                            parse_mode="HTML"
-                        )
-                        logger.info(f"[TraceID: {getattr(msg, 'trace_id', 'N/A')}] Telegram sent segment {i+1}/{len(segments)} to {chat_id}")
-                        break
-                    except Exception as e:
-                        if attempt == 2:
-                            logger.error(f"Failed to send segment after 3 attempts: {e}")
-                            # Final fallback to plain text if HTML fails
-                            await self._app.bot.send_message(chat_id=chat_id, text=segment[:4000])
-                        else:
-                            logger.warning(f"Telegram send attempt {attempt+1} failed, retrying: {e}")
-                            await asyncio.sleep(1)
+                await self._send_segment(chat_id, segment, _md_to_html_cached(segment), i, len(segments), msg)
 
         except ValueError:
             logger.error(f"Invalid chat_id: {msg.chat_id}")
         except Exception as e:
             logger.error(f"Error orchestrating Telegram send: {e}")
 
+    async def _send_segment(
+        self,
+        chat_id: int,
+        segment: str,
+        html_content: str,
+        index: int,
+        total: int,
+        msg: OutboundMessage,
+    ) -> None:
+        """Send one HTML segment with retry, falling back to plain text."""
+        # Basic retry logic for transient network issues
+        for attempt in range(self.SEND_ATTEMPTS):
+            try:
+                await self._app.bot.send_message(
+                    chat_id=chat_id,
+                    text=html_content,
+                    parse_mode="HTML"
+                )
+                logger.info(f"[TraceID: {getattr(msg, 'trace_id', 'N/A')}] Telegram sent segment {index+1}/{total} to {chat_id}")
+                return
+            except Exception as e:
+                if attempt == self.SEND_ATTEMPTS - 1:
+                    logger.error(f"Failed to send segment after {self.SEND_ATTEMPTS} attempts: {e}")
+                    # Final fallback to plain text if HTML fails
+                    await self._app.bot.send_message(chat_id=chat_id, text=segment[:4000])
+                else:
+                    logger.warning(f"Telegram send attempt {attempt+1} failed, retrying: {e}")
+                    await asyncio.sleep(_retry_delay(e, self.SEND_RETRY_DELAY))
+
     async def _on_start(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle /start command."""
         if not update.message or not update.effective_user:
             return
 
         user = update.effective_user
-        await update.message.reply_text(
-            f"你好 {user.first_name}，我是 nanobot。\n\n直接发消息即可，我会处理并回复。输入 /help 查看命令。"
-        )
+        await update.message.reply_text(_START_TEMPLATE.format(first_name=user.first_name))
 
     async def _on_help(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle /help command."""
         if not update.message:
             return
-        await update.message.reply_text(
-            "可用命令:\n"
-            "/start - 开始使用\n"
-            "/help - 查看命令说明\n"
-            "/status - 查看机器人状态\n"
-            "/failures - 查看近期失败事件\n"
-            "/diagnose - 诊断近期失败事件\n"
-            "/history - 查看会话历史\n"
-            "/use <session_key> - 切换到指定会话\n"
-            "/new - 开启新会话\n"
-            "/clear - 清空当前会话\n"
-            "/undo - 回退上一轮对话"
-        )
+        await update.message.reply_text(_HELP_TEXT)
 
     async def _on_status(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle /status command."""
@@ -349,6 +393,9 @@ class TelegramChannel(BaseChannel):
 
         # Store chat_id for replies
         self._chat_ids[sender_id] = chat_id
+        self._chat_ids.move_to_end(sender_id)
+        if len(self._chat_ids) > self.CHAT_ID_CACHE_MAX_ENTRIES:
+            self._chat_ids.popitem(last=False)
 
         content, media_paths = await build_message_content(message, self._app, self.groq_api_key)
 
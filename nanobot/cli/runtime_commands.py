@@ -537,6 +537,7 @@ def cmd_gateway(console, logo: str, port: int, verbose: bool) -> None:
             cron.stop()
             agent.stop()
             await channels.stop_all()
+            await agent.close()
             _remove_pid_lock(pid_file)
 
     asyncio.run(run())
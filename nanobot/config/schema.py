@@ -52,6 +52,11 @@ class ImessageConfig(BaseModel):
 
     enabled: bool = False
     allow_from: list[str] = Field(default_factory=list)  # Allowed phone numbers or emails
+    # Optional long-lived sender that reads one JSON object {"to": ..., "text": ...} per stdin line
+    # and answers each with one stdout line, {"ok": true} or {"ok": false, "error": ...}.
+    # A rejected, missing or late ack falls back to `imsg send` for that message.
+    # Empty keeps the default of one `imsg send` subprocess per message.
+    send_stream_command: list[str] = Field(default_factory=list)
 
 
 class ChannelsConfig(BaseModel):
@@ -227,6 +232,8 @@ class BrainConfig(BaseModel):
     summary_threshold: int = 40  # Messages count to trigger summary
     max_total_tool_calls: int = 30  # Hard cap for tool calls in a single turn
     max_turn_seconds: int = 45  # Hard cap for total processing time in a single turn
+    finish_on_terminal_content: bool = False  # Stop after a clean tool round when the reply already reads as final
+    parallel_tool_concurrency: int = 8  # Max tool calls running at once in a parallel round
 
     # Registry for additional providers (e.g. One API)
     provider_registry: list[dict[str, str]] = Field(default_factory=list)
@@ -1,5 +1,5 @@
 """Hook extension points."""
 
-from .registry import HookRegistry
+from .registry import HookRegistry, trigger_registry_hook
 
-__all__ = ["HookRegistry"]
+__all__ = ["HookRegistry", "trigger_registry_hook"]
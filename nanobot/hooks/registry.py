@@ -22,6 +22,9 @@ class HookRegistry:
             return
         self._hooks[event].append(callback)
 
+    def has_hooks(self, event: str) -> bool:
+        return bool(self._hooks.get(event))
+
     async def trigger_hook(self, event: str, payload: dict[str, Any]) -> None:
         callbacks = self._hooks.get(event, [])
         if not callbacks:
@@ -34,3 +37,23 @@ class HookRegistry:
                     await asyncio.wait_for(result, timeout=self.timeout_seconds)
             except Exception as e:
                 logger.warning(f"Hook '{event}' failed: {e}")
+
+
+async def trigger_registry_hook(registry: Any, event: str, payload: dict[str, Any]) -> None:
+    """Trigger ``event`` on any registry-like object, sync or async."""
+    if registry is None:
+        return
+    has_hooks = getattr(registry, "has_hooks", None)
+    if callable(has_hooks) and not has_hooks(event):
+        return
+    trigger = getattr(registry, "trigger_hook", None)
+    if not callable(trigger):
+        return
+    if inspect.iscoroutinefunction(trigger):
+        await trigger(event, payload)
+        return
+    # A blocking sync registry must not stall the event loop; objects with an
+    # async ``__call__`` hand back an awaitable from the worker thread instead.
+    result = await asyncio.to_thread(trigger, event, payload)
+    if inspect.isawaitable(result):
+        await result
@@ -1,9 +1,13 @@
 """Base LLM provider interface."""
 
+import sys
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
+from functools import cached_property
 from typing import Any
 
+from nanobot.utils import json_codec
+
 
 @dataclass
 class ToolCallRequest:
@@ -13,6 +17,16 @@ class ToolCallRequest:
     name: str
     arguments: dict[str, Any]
 
+    def __post_init__(self) -> None:
+        # Tool names key several per-turn counters; interning makes those lookups identity hits.
+        if type(self.name) is str:
+            self.name = sys.intern(self.name)
+
+    @cached_property
+    def arguments_json(self) -> str:
+        """Canonical (sorted-key) JSON of the arguments, serialized once per call."""
+        return json_codec.dumps(self.arguments, sort_keys=True)
+
 
 @dataclass
 class LLMResponse:
@@ -1,6 +1,8 @@
 """Session management for conversation history."""
 
 import json
+import weakref
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
@@ -62,10 +64,27 @@ class SessionManager:
     Sessions are stored as JSONL files in the sessions directory.
     """
 
-    def __init__(self, workspace: Path):
+    # Chats arrive in bursts, so a recency-bounded cache keeps hot sessions in memory
+    # without holding every chat ever seen. Evicted sessions reload from disk once
+    # nothing references them; until then the live object is handed back instead.
+    CACHE_MAX_ENTRIES = 512
+
+    def __init__(self, workspace: Path, max_cached: int | None = None):
         self.workspace = workspace
         self.sessions_dir = get_sessions_path()
-        self._cache: dict[str, Session] = {}
+        self._cache: OrderedDict[str, Session] = OrderedDict()
+        self._max_cached = max(1, max_cached or self.CACHE_MAX_ENTRIES)
+        # Evicted sessions a running turn still holds; reloading those from disk would
+        # fork the history and lose whichever copy saves first.
+        self._evicted: weakref.WeakValueDictionary[str, Session] = weakref.WeakValueDictionary()
+
+    def _remember(self, session: Session) -> None:
+        self._cache[session.key] = session
+        self._cache.move_to_end(session.key)
+        self._evicted.pop(session.key, None)
+        if len(self._cache) > self._max_cached:
+            key, evicted = self._cache.popitem(last=False)
+            self._evicted[key] = evicted
 
     def _get_session_path(self, key: str) -> Path:
         """Get the file path for a session."""
@@ -83,15 +102,23 @@ class SessionManager:
             The session.
         """
         # Check cache
-        if key in self._cache:
-            return self._cache[key]
+        session = self._cache.get(key)
+        if session is not None:
+            self._cache.move_to_end(key)
+            return session
+
+        # An evicted session still in use stays authoritative over its file
+        session = self._evicted.get(key)
+        if session is not None:
+            self._remember(session)
+            return session
 
         # Try to load from disk
         session = self._load(key)
         if session is None:
             session = Session(key=key)
 
-        self._cache[key] = session
+        self._remember(session)
         return session
 
     def _load(self, key: str) -> Session | None:
@@ -154,7 +181,7 @@ class SessionManager:
             for msg in session.messages:
                 f.write(json.dumps(msg) + "\n")
 
-        self._cache[session.key] = session
+        self._remember(session)
 
     def delete(self, key: str) -> bool:
         """
@@ -168,6 +195,7 @@ class SessionManager:
         """
         # Remove from cache
         self._cache.pop(key, None)
+        self._evicted.pop(key, None)
 
         # Remove file
         path = self._get_session_path(key)
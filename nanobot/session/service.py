@@ -1,6 +1,7 @@
 """Session routing and lightweight session operations for channels."""
 
 import json
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
@@ -12,23 +13,37 @@ from nanobot.utils.helpers import get_sessions_path, safe_filename
 class SessionService:
     """Provide active-session routing and simple session file operations."""
 
+    # Resolved '#main' keys are memoized to skip per-message migration file checks;
+    # eviction only costs a re-resolve. Explicit selections are never evicted.
+    DEFAULT_KEY_CACHE_MAX_ENTRIES = 10_000
+
     def __init__(self, channel_name: str):
         self.channel_name = channel_name
         self._active_sessions: Dict[str, str] = {}
+        self._default_keys: OrderedDict[str, str] = OrderedDict()
 
     def get_active_session_key(self, chat_id: str) -> str:
         """Return the active session key for this chat."""
-        if chat_id in self._active_sessions:
-            return self._active_sessions[chat_id]
+        key = self._active_sessions.get(chat_id)
+        if key is not None:
+            return key
+        key = self._default_keys.get(chat_id)
+        if key is not None:
+            self._default_keys.move_to_end(chat_id)
+            return key
 
         # Migrate legacy key (channel:chat_id) to readable default (channel:chat_id#main).
         self._migrate_legacy_session_key(chat_id)
-        return self._default_session_key(chat_id)
+        key = self._default_session_key(chat_id)
+        self._default_keys[chat_id] = key
+        if len(self._default_keys) > self.DEFAULT_KEY_CACHE_MAX_ENTRIES:
+            self._default_keys.popitem(last=False)
+        return key
 
     def open_new_session(self, chat_id: str) -> str:
         """Rotate to a new session key and return it."""
         new_key = self._new_session_key(chat_id)
-        self._active_sessions[chat_id] = new_key
+        self._set_active_session(chat_id, new_key)
         return new_key
 
     def clear_current_session(self, chat_id: str) -> tuple[bool, str]:
@@ -39,6 +54,8 @@ class SessionService:
         if path.exists():
             path.unlink()
             deleted = True
+        # Never leave the deleted key routable, even if rotating below fails.
+        self._active_sessions.pop(chat_id, None)
         new_key = self.open_new_session(chat_id)
         return deleted, new_key
 
@@ -72,7 +89,7 @@ class SessionService:
             return False
         if not self._session_file_path(session_key).exists():
             return False
-        self._active_sessions[chat_id] = session_key
+        self._set_active_session(chat_id, session_key)
         return True
 
     def rewind_last_turn(self, chat_id: str) -> tuple[bool, str, str]:
@@ -134,9 +151,14 @@ class SessionService:
             for msg in trimmed_messages:
                 f.write(json.dumps(msg) + "\n")
 
-        self._active_sessions[chat_id] = new_key
+        self._set_active_session(chat_id, new_key)
         return True, new_key, f"已回退 1 轮对话，移除 {removed_count} 条最近消息并切换到新会话。"
 
+    def _set_active_session(self, chat_id: str, session_key: str) -> None:
+        """Record an explicit selection (/new, /use, /clear, /undo); it outranks the default."""
+        self._active_sessions[chat_id] = session_key
+        self._default_keys.pop(chat_id, None)
+
     def _new_session_key(self, chat_id: str) -> str:
         ts = datetime.now().strftime("%Y%m%d_%H%M%S")
         return f"{self.channel_name}:{chat_id}#s{ts}_{uuid4().hex[:6]}"
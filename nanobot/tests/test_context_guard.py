@@ -0,0 +1,16 @@
+from nanobot.agent.context_guard import ContextGuard, TokenCounter
+
+
+def test_context_guard_precheck_skips_small_conversations(monkeypatch):
+    monkeypatch.setattr(TokenCounter, "get_encoding", classmethod(lambda cls: object()))
+    guard = ContextGuard(limit=1000)
+    small = [{"role": "user", "content": "北京天气"}]
+    large = [{"role": "tool", "name": "x", "content": "a" * 2000}]
+    assert guard.may_need_compaction(small) is False
+    assert guard.may_need_compaction(large) is True
+
+
+def test_context_guard_precheck_defers_without_tokenizer(monkeypatch):
+    monkeypatch.setattr(TokenCounter, "get_encoding", classmethod(lambda cls: False))
+    guard = ContextGuard(limit=1000)
+    assert guard.may_need_compaction([{"role": "user", "content": "hi"}]) is True
@@ -1,3 +1,6 @@
+import asyncio
+import time
+from collections import Counter
 from pathlib import Path
 
 import pytest
@@ -5,7 +8,7 @@ import pytest
 from nanobot.agent.loop import AgentLoop
 from nanobot.agent.models import ModelRegistry, ProviderInfo
 from nanobot.agent.provider_router import ProviderRouter
-from nanobot.agent.tools.base import ToolResult
+from nanobot.agent.tools.base import ToolResult, ToolSeverity
 from nanobot.agent.turn_engine import TurnEngine
 from nanobot.bus.queue import MessageBus
 from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
@@ -82,6 +85,28 @@ class _FakeContext:
         messages.append({"role": "tool", "tool_call_id": tool_call_id, "name": tool_name, "content": result})
         return messages
 
+    def add_tool_results(self, messages, results):
+        for tool_call_id, tool_name, result in results:
+            self.add_tool_result(messages, tool_call_id, tool_name, result)
+        return messages
+
+
+def _make_engine(**overrides) -> TurnEngine:
+    kwargs = {
+        "context": _FakeContext(),
+        "executor": None,
+        "model": "test-model",
+        "max_iterations": 1,
+        "get_tools_definitions": lambda: [],
+        "chat_with_failover": None,
+        "parse_tool_calls_from_text": lambda text: [],
+        "summarize_messages": None,
+        "self_correction_prompt": "",
+        "loop_break_reply": "",
+    }
+    kwargs.update(overrides)
+    return TurnEngine(**kwargs)
+
 
 class _FakeExecutor:
     async def execute(self, name, params):
@@ -99,14 +124,10 @@ async def test_turn_engine_breaks_repeated_tool_loop():
     async def _summarize(messages):
         return "summary"
 
-    engine = TurnEngine(
-        context=_FakeContext(),
+    engine = _make_engine(
         executor=_FakeExecutor(),
-        model="test-model",
         max_iterations=6,
-        get_tools_definitions=lambda: [],
         chat_with_failover=_chat_with_failover,
-        parse_tool_calls_from_text=lambda text: [],
         summarize_messages=_summarize,
         self_correction_prompt="self-correct",
         loop_break_reply="loop-broken",
@@ -179,3 +200,360 @@ def test_session_service_use_session(monkeypatch, tmp_path: Path):
     assert svc.use_session(chat_id, key) is True
     assert svc.get_active_session_key(chat_id) == key
     assert svc.use_session(chat_id, "telegram:999#x") is False
+
+
+def test_session_service_resolves_default_key_once(monkeypatch, tmp_path: Path):
+    monkeypatch.setenv("NANOBOT_HOME", str(tmp_path / ".home"))
+    svc = SessionService(channel_name="telegram")
+    calls: list[str] = []
+    monkeypatch.setattr(svc, "_migrate_legacy_session_key", calls.append)
+
+    assert svc.get_active_session_key("123") == "telegram:123#main"
+    assert svc.get_active_session_key("123") == "telegram:123#main"
+    assert calls == ["123"]
+    new_key = svc.open_new_session("123")
+    assert svc.get_active_session_key("123") == new_key
+
+
+def test_session_service_active_sessions_are_lru_bounded(monkeypatch, tmp_path: Path):
+    monkeypatch.setenv("NANOBOT_HOME", str(tmp_path / ".home"))
+    monkeypatch.setattr(SessionService, "DEFAULT_KEY_CACHE_MAX_ENTRIES", 2)
+    svc = SessionService(channel_name="telegram")
+    monkeypatch.setattr(svc, "_migrate_legacy_session_key", lambda chat_id: None)
+
+    switched = svc.open_new_session("a")
+    for chat_id in ("b", "c", "d", "e"):
+        svc.get_active_session_key(chat_id)
+    assert list(svc._default_keys) == ["d", "e"]
+    assert svc.get_active_session_key("a") == switched
+    assert svc.get_active_session_key("b") == "telegram:b#main"
+
+def test_turn_engine_value_mentioned_uses_token_overlap():
+    engine = _make_engine()
+    assert engine._value_mentioned("查一下北京天气", "北京") is True
+    assert engine._value_mentioned("weather in New York", "new york city") is True
+    assert engine._value_mentioned("查一下北京天气", "上海") is False
+
+
+@pytest.mark.asyncio
+async def test_turn_engine_builds_tool_definitions_once_per_run():
+    calls = {"defs": 0, "chat": 0, "filter": 0}
+
+    def _get_defs():
+        calls["defs"] += 1
+        return []
+
+    class _CountingPolicy:
+        def filter_tools(self, *, messages, tool_definitions, failed_tools):
+            calls["filter"] += 1
+            return tool_definitions
+
+    async def _chat_with_failover(messages, tools):
+        calls["chat"] += 1
+        if calls["chat"] < 3:
+            return LLMResponse(
+                content=None,
+                tool_calls=[ToolCallRequest(id=f"call_{calls['chat']}", name="echo", arguments={"n": calls["chat"]})],
+            )
+        return LLMResponse(content="done")
+
+    async def _summarize(messages):
+        return "summary"
+
+    engine = _make_engine(
+        executor=_FakeExecutor(),
+        max_iterations=6,
+        get_tools_definitions=_get_defs,
+        chat_with_failover=_chat_with_failover,
+        summarize_messages=_summarize,
+        self_correction_prompt="self-correct",
+        loop_break_reply="loop-broken",
+        tool_policy=_CountingPolicy(),
+    )
+    out = await engine.run(
+        messages=[{"role": "system", "content": "s"}],
+        trace_id="t2",
+        parse_calls_from_text=False,
+        include_severity=False,
+        parallel_tool_exec=True,
+        compact_after_tools=False,
+    )
+    assert out == "done"
+    assert calls == {"defs": 1, "chat": 3, "filter": 1}
+
+
+def test_turn_engine_clarification_uses_turn_user_text():
+    engine = _make_engine()
+    calls = [ToolCallRequest(id="c1", name="weather", arguments={"location": "上海"})]
+    assert engine._clarification_needed(user_text="今天天气怎么样", tool_calls=calls)
+    assert engine._clarification_needed(user_text="上海今天天气怎么样", tool_calls=calls) is None
+    assert engine._clarification_needed(user_text="", tool_calls=calls) is None
+
+
+@pytest.mark.asyncio
+async def test_turn_engine_parallel_results_keep_call_order():
+    class _SlowFirstExecutor:
+        async def execute(self, name, params):
+            await asyncio.sleep(0.05 if name == "slow" else 0)
+            return ToolResult(success=True, output=name)
+
+    engine = _make_engine(executor=_SlowFirstExecutor())
+    messages: list[dict] = []
+    statuses = await engine._execute_tool_calls(
+        messages=messages,
+        tool_calls=[
+            ToolCallRequest(id="c1", name="slow", arguments={}),
+            ToolCallRequest(id="c2", name="fast", arguments={}),
+        ],
+        trace_id=None,
+        include_severity=False,
+        parallel_tool_exec=True,
+    )
+    assert statuses == [("slow", True), ("fast", True)]
+    assert [m["tool_call_id"] for m in messages] == ["c1", "c2"]
+
+
+@pytest.mark.asyncio
+async def test_turn_engine_reuses_forced_summary_for_same_context():
+    calls = {"chat": 0}
+
+    async def _chat_with_failover(messages, tools):
+        calls["chat"] += 1
+        return LLMResponse(content="final summary")
+
+    engine = _make_engine(chat_with_failover=_chat_with_failover)
+    messages = [{"role": "user", "content": "q"}, {"role": "tool", "name": "echo", "content": "r"}]
+    first = await engine._finalize_after_budget(messages=messages, reason="budget")
+    second = await engine._finalize_after_budget(messages=messages, reason="budget")
+    third = await engine._finalize_after_budget(messages=messages, reason="timeout")
+    assert first == second == third == "final summary"
+    assert calls["chat"] == 2
+
+
+@pytest.mark.asyncio
+async def test_turn_engine_compaction_keeps_leading_system_and_recent(monkeypatch):
+    import nanobot.agent.turn_engine as turn_engine_mod
+
+    class _AlwaysCompactGuard:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def may_need_compaction(self, messages):
+            return True
+
+        def evaluate(self, messages):
+            return {"should_compact": True, "utilization": 0.99}
+
+    monkeypatch.setattr(turn_engine_mod, "ContextGuard", _AlwaysCompactGuard)
+    summarized: list[list[dict]] = []
+
+    async def _summarize(msgs):
+        summarized.append(list(msgs))
+        return "S"
+
+    engine = _make_engine(summarize_messages=_summarize)
+    messages = [
+        {"role": "system", "content": "base"},
+        {"role": "system", "content": "Previous conversation summary: old"},
+    ] + [{"role": "user", "content": f"m{i}"} for i in range(12)]
+    await engine._compact_messages_if_needed(messages, "t")
+    assert [m["content"] for m in summarized[0]] == ["m0", "m1"]
+    assert messages[0]["content"] == "base"
+    assert messages[1]["content"] == "Previous conversation summary: S"
+    assert [m["content"] for m in messages[2:]] == [f"m{i}" for i in range(2, 12)]
+
+    summarized.clear()
+    messages = (
+        [{"role": "system", "content": "base"}]
+        + [{"role": "user", "content": f"m{i}"} for i in range(2)]
+        + [{"role": "system", "content": "self-correct"}]
+        + [{"role": "user", "content": f"m{i}"} for i in range(2, 12)]
+    )
+    await engine._compact_messages_if_needed(messages, "t")
+    assert [m["content"] for m in summarized[0]] == ["m0", "m1"]
+
+    async def _no_summary(msgs):
+        return None
+
+    engine.summarize_messages = _no_summary
+    messages = (
+        [{"role": "system", "content": "base"}]
+        + [{"role": "user", "content": "查北京天气\n谢谢"}]
+        + [{"role": "tool", "name": "weather", "content": "晴"}]
+        + [{"role": "user", "content": f"m{i}"} for i in range(10)]
+    )
+    await engine._compact_messages_if_needed(messages, "t")
+    assert messages[1]["content"] == "Previous conversation summary: 用户消息 1 条，最近诉求：查北京天气；使用过的工具：weather"
+
+
+@pytest.mark.asyncio
+async def test_turn_engine_reuses_context_guard(monkeypatch):
+    import nanobot.agent.turn_engine as turn_engine_mod
+
+    created = []
+
+    class _CountingGuard:
+        def __init__(self, *args, **kwargs):
+            created.append(self)
+
+        def may_need_compaction(self, messages):
+            return False
+
+    monkeypatch.setattr(turn_engine_mod, "ContextGuard", _CountingGuard)
+    engine = _make_engine()
+    messages = [{"role": "user", "content": f"m{i}"} for i in range(12)]
+    for _ in range(3):
+        await engine._compact_messages_if_needed(messages, None)
+    assert len(created) == 1
+
+
+def test_format_tool_result_output_plain_and_decorated():
+    engine = _make_engine()
+    plain = ToolResult(success=True, output="ok")
+    assert engine._format_tool_result_output(plain, include_severity=True) == "ok"
+
+    decorated = ToolResult(
+        success=False,
+        output="boom",
+        remedy="fix it",
+        severity=ToolSeverity.ERROR,
+        should_retry=True,
+    )
+    out = engine._format_tool_result_output(decorated, include_severity=True)
+    assert out == (
+        f"[severity:{ToolSeverity.ERROR}]\nboom\n\n[系统及工具建议: fix it]"
+        "\n\n[系统提示: 建议重试该工具调用，或调整参数后重试。]"
+    )
+    assert engine._format_tool_result_output(decorated, include_severity=False).startswith("boom\n\n")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("content", "tool_result", "expected_chats"),
+    [
+        ("北京今天晴，25°C。", ToolResult(success=True, output="晴"), 1),
+        ("让我查一下天气：", ToolResult(success=True, output="晴"), 2),
+        ("北京今天晴，25°C。", ToolResult(success=True, output="晴", should_retry=True), 2),
+    ],
+)
+async def test_turn_engine_finishes_on_terminal_content(content, tool_result, expected_chats):
+    calls = {"chat": 0}
+
+    class _Executor:
+        async def execute(self, name, params):
+            return tool_result
+
+    async def _chat_with_failover(messages, tools):
+        calls["chat"] += 1
+        if calls["chat"] == 1:
+            return LLMResponse(
+                content=content,
+                tool_calls=[ToolCallRequest(id="c1", name="weather", arguments={"location": "北京"})],
+            )
+        return LLMResponse(content="follow-up")
+
+    engine = _make_engine(
+        executor=_Executor(),
+        max_iterations=3,
+        chat_with_failover=_chat_with_failover,
+        finish_on_terminal_content=True,
+    )
+    out = await engine.run(
+        messages=[{"role": "system", "content": "s"}, {"role": "user", "content": "北京天气"}],
+        trace_id=None,
+        parse_calls_from_text=False,
+        include_severity=False,
+        parallel_tool_exec=True,
+        compact_after_tools=False,
+    )
+    assert calls["chat"] == expected_chats
+    assert out == (content if expected_chats == 1 else "follow-up")
+
+
+def test_forced_summary_uses_running_tool_stats():
+    engine = _make_engine()
+    history = [{"role": "tool", "name": "old_tool", "content": "x"}]
+    out = engine._build_forced_summary(
+        messages=history,
+        reason="budget",
+        tool_stats=Counter({"web_search": 2, "weather": 1}),
+        recent_tools=["web_search", "weather", "web_search"],
+    )
+    assert "weather×1，web_search×2" in out
+    assert "web_search -> weather -> web_search" in out
+    assert "old_tool" not in out
+
+    scanned = engine._build_forced_summary(messages=history, reason="budget")
+    assert "old_tool×1" in scanned
+
+
+@pytest.mark.asyncio
+async def test_turn_engine_parallel_tools_bounded_and_deadlined():
+    state = {"running": 0, "peak": 0}
+
+    class _Executor:
+        async def execute(self, name, params):
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+            try:
+                await asyncio.sleep(5 if name == "hang" else 0.01)
+            finally:
+                state["running"] -= 1
+            return ToolResult(success=True, output=name)
+
+    engine = _make_engine(executor=_Executor(), parallel_tool_concurrency=2)
+    messages: list[dict] = []
+    started = time.monotonic()
+    statuses = await engine._execute_tool_calls(
+        messages=messages,
+        tool_calls=[ToolCallRequest(id=f"c{i}", name="quick", arguments={"i": i}) for i in range(4)]
+        + [ToolCallRequest(id="h", name="hang", arguments={})],
+        trace_id=None,
+        include_severity=False,
+        parallel_tool_exec=True,
+        deadline=time.monotonic() + 0.6,
+    )
+    assert time.monotonic() - started < 2
+    assert state["peak"] <= 2
+    assert statuses[-1] == ("hang", False)
+    assert "timed out" in messages[-1]["content"]
+
+
+@pytest.mark.asyncio
+async def test_turn_engine_parallel_tool_timeout_without_deadline_keeps_error():
+    class _Executor:
+        async def execute(self, name, params):
+            raise TimeoutError("upstream api timed out")
+
+    engine = _make_engine(executor=_Executor())
+    messages: list[dict] = []
+    statuses = await engine._execute_tool_calls(
+        messages=messages,
+        tool_calls=[ToolCallRequest(id="t", name="slow", arguments={})],
+        trace_id=None,
+        include_severity=False,
+        parallel_tool_exec=True,
+    )
+    assert statuses == [("slow", False)]
+    assert "upstream api timed out" in messages[-1]["content"]
+
+
+def test_compaction_pins_relevant_older_messages():
+    engine = _make_engine()
+    older = [
+        {"role": "user", "content": "我的航班是 CA1234"},
+        {"role": "assistant", "content": "好的", "tool_calls": [{"id": "x"}]},
+        {"role": "tool", "name": "flight", "content": "CA1234 准点"},
+        {"role": "assistant", "content": "今天天气不错"},
+        {"role": "user", "content": "CA1234 几点登机"},
+    ]
+    pinned = engine._select_pinned_messages(older, "帮我查 CA1234 的登机口")
+    assert pinned == [older[0], older[4]]
+    assert engine._select_pinned_messages(older, "") == []
+
+
+def test_parse_tool_calls_from_text_requires_arguments_key(tmp_path: Path):
+    loop = AgentLoop(bus=MessageBus(), provider=_OkProvider(), workspace=tmp_path)
+    assert loop._parse_tool_calls_from_text('好的 {"name": "read_file"}') == []
+    calls = loop._parse_tool_calls_from_text('{"name": "read_file", "arguments": {"path": "a.txt"}}')
+    assert [(c.name, c.arguments) for c in calls] == [("read_file", {"path": "a.txt"})]
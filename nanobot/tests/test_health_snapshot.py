@@ -88,3 +88,20 @@ def test_collect_tool_health_snapshot(monkeypatch, tmp_path: Path):
     assert snap["summary"]["empty_reply_rate"] == 0.5
     assert snap["tools"]["tavily"]["calls"] == 2
     assert snap["tools"]["tavily"]["timeout_rate"] == 0.5
+
+
+def test_log_events_appends_batch_in_order(monkeypatch, tmp_path: Path):
+    from nanobot.utils.audit import log_event, log_events
+
+    data_dir, _ = _setup_tmp_home(monkeypatch, tmp_path)
+    log_events([
+        {"type": "tool_start", "tool": "a"},
+        {"type": "tool_end", "tool": "a", "ts": "fixed"},
+    ])
+    log_event({"type": "custom"})
+    log_events([])
+
+    rows = [json.loads(line) for line in (data_dir / "audit.log").read_text(encoding="utf-8").splitlines()]
+    assert [r["type"] for r in rows] == ["tool_start", "tool_end", "custom"]
+    assert rows[0]["status"] is None and rows[0]["ts"]
+    assert rows[1]["ts"] == "fixed"
@@ -1,5 +1,5 @@
 import pytest
-from nanobot.agent.honesty import audit_and_mark_hallucinations
+from nanobot.agent.honesty import audit_and_mark_hallucinations, narrow_to_content, unexecuted_tool_aliases
 
 def test_hallucination_detection_strikethrough():
     # 模拟工具元数据
@@ -66,3 +66,12 @@ def test_mcp_format_compatibility():
     
     assert detected is False
     assert "~~" not in processed
+
+def test_narrow_to_content_keeps_only_mentioned_unused_tools():
+    meta = [
+        {"name": "github", "description": "GitHub 仓库操作工具"},
+        {"name": "amap", "description": "高德地图"},
+    ]
+    unused = unexecuted_tool_aliases([], meta)
+    assert narrow_to_content("今天天气不错。", unused) == []
+    assert [n for n, _ in narrow_to_content("我刚才用了 高德地图 查路线", unused)] == ["amap"]
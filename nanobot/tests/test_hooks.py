@@ -3,7 +3,7 @@ import pytest
 from nanobot.agent.executor import ToolExecutor
 from nanobot.agent.tools.base import ToolResult
 from nanobot.agent.turn_engine import TurnEngine
-from nanobot.hooks import HookRegistry
+from nanobot.hooks import HookRegistry, trigger_registry_hook
 from nanobot.providers.base import LLMResponse
 
 
@@ -16,6 +16,11 @@ class _FakeContext:
         messages.append({"role": "tool", "tool_call_id": tool_call_id, "name": tool_name, "content": result})
         return messages
 
+    def add_tool_results(self, messages, results):
+        for tool_call_id, tool_name, result in results:
+            self.add_tool_result(messages, tool_call_id, tool_name, result)
+        return messages
+
 
 class _FakeToolRegistry:
     def get(self, name: str):
@@ -41,6 +46,8 @@ async def test_hook_registry_isolation_and_async_callbacks():
     await hooks.trigger_hook("evt", {"id": 1})
 
     assert events == [1]
+    assert hooks.has_hooks("evt") is True
+    assert hooks.has_hooks("other") is False
 
 
 @pytest.mark.asyncio
@@ -113,3 +120,34 @@ async def test_turn_engine_emits_turn_hooks():
     assert ("start", 1) in seen
     assert ("end", "final_text") in seen
     assert ("turn_end", True) in seen
+
+
+@pytest.mark.asyncio
+async def test_tool_executor_supports_sync_hook_registry():
+    seen = []
+
+    class _SyncRegistry:
+        def trigger_hook(self, event, payload):
+            seen.append(event)
+
+    executor = ToolExecutor(_FakeToolRegistry(), hook_registry=_SyncRegistry())
+    out = await executor.execute("echo", {"q": "hi"})
+
+    assert out.success is True
+    assert seen == ["tool_before", "tool_after"]
+
+
+@pytest.mark.asyncio
+async def test_trigger_registry_hook_awaits_async_callable_objects():
+    seen = []
+
+    class _AsyncTrigger:
+        async def __call__(self, event, payload):
+            seen.append((event, payload["id"]))
+
+    class _Registry:
+        trigger_hook = _AsyncTrigger()
+
+    await trigger_registry_hook(_Registry(), "evt", {"id": 7})
+
+    assert seen == [("evt", 7)]
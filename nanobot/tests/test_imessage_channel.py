@@ -0,0 +1,108 @@
+import asyncio
+import json
+import sys
+
+import pytest
+
+import nanobot.channels.imessage as imessage_mod
+from nanobot.bus.events import OutboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.channels.imessage import ImessageChannel
+from nanobot.config.schema import ImessageConfig
+
+
+@pytest.mark.asyncio
+async def test_send_reuses_persistent_stream_process(tmp_path):
+    out = tmp_path / "sent.jsonl"
+    script = (
+        f"import sys\nwith open({str(out)!r}, 'w') as f:\n    for line in sys.stdin:\n"
+        "        f.write(line); f.flush(); print('{\"ok\": true}', flush=True)\n"
+    )
+    channel = ImessageChannel(
+        ImessageConfig(send_stream_command=[sys.executable, "-c", script]), MessageBus()
+    )
+
+    await channel.send(OutboundMessage(channel="imessage", chat_id="+1", content="hi"))
+    first_proc = channel._send_proc
+    await channel.send(OutboundMessage(channel="imessage", chat_id="+1", content="again"))
+    assert channel._send_proc is first_proc
+
+    await channel.stop()
+    lines = [json.loads(x) for x in out.read_text().splitlines()]
+    assert lines == [{"to": "+1", "text": "hi"}, {"to": "+1", "text": "again"}]
+
+
+@pytest.mark.asyncio
+async def test_send_falls_back_when_stream_rejects_or_exits():
+    script = (
+        "import sys\nline = sys.stdin.readline()\n"
+        "sys.stderr.write('helper: no session\\n')\n"
+        "print('{\"ok\": false, \"error\": \"no session\"}', flush=True)\n"
+    )
+    channel = ImessageChannel(
+        ImessageConfig(send_stream_command=[sys.executable, "-c", script]), MessageBus()
+    )
+    fallback: list[str] = []
+
+    async def _cli(recipient, text):
+        fallback.append(text)
+
+    channel._send_via_cli = _cli
+    await channel.send(OutboundMessage(channel="imessage", chat_id="+1", content="rejected"))
+    await channel.send(OutboundMessage(channel="imessage", chat_id="+1", content="after exit"))
+    await channel.stop()
+    assert fallback == ["rejected", "after exit"]
+
+
+def _watch_channel(monkeypatch, *chunks: bytes) -> tuple[ImessageChannel, list[str]]:
+    reader = asyncio.StreamReader()
+    for chunk in chunks:
+        reader.feed_data(chunk)
+    reader.feed_eof()
+
+    class _Proc:
+        stdout = reader
+        returncode = 0
+
+        def terminate(self):
+            pass
+
+        async def wait(self):
+            return 0
+
+    async def _fake_exec(*_args, **_kwargs):
+        return _Proc()
+
+    monkeypatch.setattr(imessage_mod.asyncio, "create_subprocess_exec", _fake_exec)
+    channel = ImessageChannel(ImessageConfig(), MessageBus())
+    seen: list[str] = []
+
+    async def _record(data):
+        seen.append(data["text"])
+
+    channel._process_incoming_message = _record
+    return channel, seen
+
+
+@pytest.mark.asyncio
+async def test_watch_splits_multiple_records_per_chunk(monkeypatch):
+    channel, seen = _watch_channel(
+        monkeypatch,
+        b'{"text":"a","sender":"+1"}\n{"text":"b","sen',
+        b'der":"+2"}\n\n{"text":"c","sender":"+3"}',
+    )
+    await channel.start()
+    assert seen == ["a", "b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_watch_drops_whole_oversized_record(monkeypatch):
+    channel, seen = _watch_channel(
+        monkeypatch,
+        b'{"text":"' + b"x" * 40,
+        b"x" * 40,
+        b'","sender":"+1"}\n{"text":"ok","sender":"+2"}\n{"text":"' + b"y" * 40 + b'"}\n',
+    )
+    channel.MAX_RECORD_BYTES = 32
+    await channel.start()
+    assert seen == ["ok"]
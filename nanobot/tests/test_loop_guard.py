@@ -1,4 +1,14 @@
-from nanobot.agent.loop_guard import RepeatWindow, tool_call_hash
+from nanobot.agent.loop_guard import (
+    BoundedSet,
+    RepeatWindow,
+    batch_signature,
+    collect_call_ids_and_hashes,
+    is_hash_loop,
+    is_id_loop,
+    tool_call_hash,
+)
+from nanobot.providers.base import ToolCallRequest
+from nanobot.utils import json_codec
 
 
 def test_tool_call_hash_stable_for_same_payload():
@@ -12,3 +22,54 @@ def test_repeat_window_counts_and_resets():
     assert rw.update("a") == 1
     assert rw.update("a") == 2
     assert rw.update("b") == 1
+
+
+def test_tool_call_hash_distinguishes_name_and_args():
+    base = tool_call_hash("exec", {"command": "echo hi"})
+    assert base != tool_call_hash("read_file", {"command": "echo hi"})
+    assert base != tool_call_hash("exec", {"command": "echo bye"})
+    assert len(base) == 32
+
+
+def test_batch_signature_ignores_order_but_keeps_multiplicity():
+    assert batch_signature(["a", "b"]) == batch_signature(["b", "a"])
+    assert batch_signature(["a"]) != batch_signature(["a", "a"])
+
+
+def test_json_codec_dumps_sorts_and_falls_back_for_non_str_keys():
+    assert json_codec.dumps({"b": 1, "a": "北京"}, sort_keys=True) == '{"a":"北京","b":1}'
+    assert json_codec.loads(json_codec.dumps({1: "x"})) == {"1": "x"}
+
+
+def test_bounded_set_evicts_oldest():
+    seen = BoundedSet(2)
+    for item in ("a", "b", "a", "c"):
+        seen.add(item)
+    assert "a" not in seen
+    assert "b" in seen and "c" in seen
+    assert len(seen) == 2
+
+
+def test_tool_call_request_hash_matches_shared_builder():
+    tc = ToolCallRequest(id="c1", name="exec", arguments={"x": 1, "command": "echo hi"})
+    assert tc.arguments_json == '{"command":"echo hi","x":1}'
+    _, hashes = collect_call_ids_and_hashes([tc])
+    assert hashes == [tool_call_hash("exec", {"command": "echo hi", "x": 1})]
+
+
+def test_loop_checks_accept_bounded_and_plain_sets():
+    seen = BoundedSet(capacity=4)
+    for item in ("a", "b", "c"):
+        seen.add(item)
+
+    assert is_hash_loop(["a", "b"], seen) is True
+    assert is_hash_loop(["a", "z"], seen) is False
+    assert is_id_loop([], seen) is False
+    assert is_id_loop(["c"], {"c"}) is True
+
+
+def test_tool_call_request_interns_name():
+    name = "".join(["web", "_search"])
+    a = ToolCallRequest(id="1", name=name, arguments={})
+    b = ToolCallRequest(id="2", name="".join(["web_", "search"]), arguments={})
+    assert a.name is b.name
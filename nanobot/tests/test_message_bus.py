@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+
+from nanobot.bus.events import OutboundMessage
+from nanobot.bus.queue import MessageBus
+
+
+@pytest.mark.asyncio
+async def test_dispatch_outbound_delivers_and_stops_without_polling():
+    bus = MessageBus()
+    received: list[str] = []
+    done = asyncio.Event()
+
+    async def _cb(msg: OutboundMessage) -> None:
+        received.append(msg.content)
+        done.set()
+
+    bus.subscribe_outbound("cli", _cb)
+    task = asyncio.create_task(bus.dispatch_outbound())
+    await bus.publish_outbound(OutboundMessage(channel="cli", chat_id="c", content="hi"))
+    await asyncio.wait_for(done.wait(), timeout=1.0)
+    assert received == ["hi"]
+
+    bus.stop()
+    await asyncio.wait_for(task, timeout=1.0)
+    assert task.done() and not task.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_publish_inbound_times_out_only_when_full():
+    from nanobot.bus.events import InboundMessage
+
+    bus = MessageBus(max_size=1)
+    msg = InboundMessage(channel="cli", sender_id="u", chat_id="c", content="x")
+    assert await bus.publish_inbound(msg, timeout=0.01) is True
+    assert await bus.publish_inbound(msg, timeout=0.01) is False
+    assert bus.inbound_size == 1
@@ -1,3 +1,4 @@
+import gc
 import json
 from pathlib import Path
 
@@ -38,3 +39,27 @@ def test_list_sessions_keeps_legacy_fallback(monkeypatch, tmp_path: Path) -> Non
     sessions = mgr.list_sessions()
     assert sessions
     assert any(item["key"] == "telegram:direct" for item in sessions)
+
+
+def test_session_cache_is_lru_bounded_and_reloads_evicted(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setenv("NANOBOT_HOME", str(tmp_path / ".home"))
+    mgr = SessionManager(workspace=tmp_path, max_cached=2)
+
+    a = mgr.get_or_create("cli:a")
+    a.add_message("user", "hi")
+    mgr.save(a)
+    mgr.get_or_create("cli:b")
+    assert mgr.get_or_create("cli:a") is a  # refreshes recency
+    mgr.get_or_create("cli:c")  # evicts b, not a
+
+    assert list(mgr._cache) == ["cli:a", "cli:c"]
+    mgr.get_or_create("cli:d")
+    assert "cli:a" not in mgr._cache
+    assert mgr.get_or_create("cli:a") is a  # still referenced, so not forked from disk
+
+    mgr.get_or_create("cli:e")
+    mgr.get_or_create("cli:f")
+    del a
+    gc.collect()
+    reloaded = mgr.get_or_create("cli:a")
+    assert [m["content"] for m in reloaded.messages] == ["hi"]
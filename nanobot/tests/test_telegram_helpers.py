@@ -2,8 +2,15 @@ from pathlib import Path
 
 import pytest
 
+from telegram.error import RetryAfter
+
+from nanobot.bus.events import OutboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.channels import telegram as telegram_mod
+from nanobot.channels.telegram import TelegramChannel, _md_to_html_cached, _split_cached
 from nanobot.channels.telegram_format import markdown_to_telegram_html, split_message
 from nanobot.channels.telegram_media import build_message_content
+from nanobot.config.schema import TelegramConfig
 
 
 def test_markdown_to_telegram_html_basic():
@@ -66,3 +73,37 @@ async def test_build_message_content_with_document_download(monkeypatch, tmp_pat
     saved = Path(media[0])
     assert saved.exists()
     assert "[file:" in content
+
+
+@pytest.mark.asyncio
+async def test_telegram_send_retry_honors_retry_after(monkeypatch):
+    waits: list[float] = []
+    attempts = {"n": 0}
+
+    async def _sleep(seconds):
+        waits.append(seconds)
+
+    class _Bot:
+        async def send_message(self, chat_id, text, parse_mode=None):
+            attempts["n"] += 1
+            if attempts["n"] == 1:
+                raise RetryAfter(7)
+            if attempts["n"] == 2:
+                raise RuntimeError("network")
+
+    class _App:
+        bot = _Bot()
+
+    monkeypatch.setattr(telegram_mod.asyncio, "sleep", _sleep)
+    channel = TelegramChannel(TelegramConfig(token="x"), MessageBus())
+    channel._app = _App()
+
+    await channel.send(OutboundMessage(channel="telegram", chat_id="1", content="hi"))
+    assert attempts["n"] == 3
+    assert waits == [7.0, TelegramChannel.SEND_RETRY_DELAY]
+
+
+def test_telegram_segment_conversion_is_cached():
+    text = "**cached** segment"
+    assert _split_cached(text) is _split_cached(text)
+    assert _md_to_html_cached(text) == markdown_to_telegram_html(text)
@@ -1,12 +1,21 @@
+import asyncio
+import json
+import os
+
 import pytest
 
 from nanobot.agent.location_utils import location_query_variants
+from nanobot.agent.tools import weather as weather_mod
 from nanobot.agent.tools.amap import AmapTool
 from nanobot.agent.tools.github import GitHubTool
 from nanobot.agent.tools.train_ticket import TrainTicketTool
 from nanobot.agent.tools.weather import WeatherTool
 
 
+async def _noop_async(*_args, **_kwargs):
+    return None
+
+
 def test_weather_pick_best_location_prefers_county_over_city():
     tool = WeatherTool()
     locs = [
@@ -86,3 +95,154 @@ def test_amap_weather_result_too_broad_detector():
     tool = AmapTool()
     assert tool._weather_result_too_broad("重庆市忠县汝溪镇", '{"city":"重庆市"}') is True
     assert tool._weather_result_too_broad("重庆市忠县汝溪镇", '{"city":"忠县"}') is False
+
+
+@pytest.mark.asyncio
+async def test_weather_now_result_is_cached(monkeypatch):
+    weather_mod._WEATHER_CACHE.clear()
+    tool = WeatherTool()
+    calls: list[str] = []
+
+    now = {"text": "晴", "temp": "20", "feelsLike": "19", "windDir": "北风", "windScale": "2", "obsTime": "t"}
+
+    async def _fake_fetch(_client, action, _base_url, _params):
+        calls.append(action)
+        return {"code": "200", "now": now}
+
+    async def _fake_lookup(_client, location, _host, _key, _lang):
+        return "101010100", f"{location} 显示名"
+
+    monkeypatch.setattr(tool, "_load_config", lambda: {"key": "k"})
+    monkeypatch.setattr(tool, "_fetch_payload", _fake_fetch)
+    monkeypatch.setattr(tool, "_lookup_location", _fake_lookup)
+    monkeypatch.setattr(tool, "_geo_cache_get", lambda *_args: None)
+    monkeypatch.setattr(tool, "_geo_cache_put", _noop_async)
+    first = await tool.execute(action="now", location="北京")
+    second = await tool.execute(action="now", location="Beijing")
+    assert calls == ["now"]
+    assert "北京 显示名" in first.output
+    assert "Beijing 显示名" in second.output and "北京" not in second.output
+    weather_mod._WEATHER_CACHE.clear()
+
+
+@pytest.mark.asyncio
+async def test_weather_geo_lookup_is_persisted(monkeypatch, tmp_path):
+    monkeypatch.setenv("NANOBOT_HOME", str(tmp_path))
+    weather_mod._WEATHER_CACHE.clear()
+    lookups: list[str] = []
+
+    async def _fake_lookup(_client, location, _host, _key, _lang):
+        lookups.append(location)
+        return "101010100", "北京市 北京"
+
+    first = WeatherTool()
+    monkeypatch.setattr(first, "_load_config", lambda: {"key": "k"})
+    monkeypatch.setattr(first, "_lookup_location", _fake_lookup)
+    out = await first.execute(action="search", location="北京")
+    assert "101010100" in out.output
+
+    second = WeatherTool()
+    monkeypatch.setattr(second, "_load_config", lambda: {"key": "k"})
+    monkeypatch.setattr(second, "_lookup_location", _fake_lookup)
+    out = await second.execute(action="search", location="北京")
+    assert "北京市 北京" in out.output
+    assert lookups == ["北京"]
+    assert (tmp_path / "weather_geocache.json").exists()
+
+
+@pytest.mark.asyncio
+async def test_weather_geo_lookup_takes_first_successful_domain(monkeypatch):
+    tool = WeatherTool()
+    cancelled: list[str] = []
+
+    async def _fake_probe(_client, domain, _query, _location, _key, _lang):
+        if domain == "slow.example.com":
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(domain)
+                raise
+        if domain == "geoapi.qweather.com":
+            return "101010100", "北京"
+        return None
+
+    monkeypatch.setattr(tool, "_probe_geo_domain", _fake_probe)
+    resolved = await tool._lookup_location(None, "北京", "slow.example.com", "k", "zh")  # type: ignore[arg-type]
+    await asyncio.sleep(0)
+    assert resolved == ("101010100", "北京")
+    assert cancelled == ["slow.example.com"]
+
+
+@pytest.mark.asyncio
+async def test_weather_forecast_output_format():
+    class _Resp:
+        status_code = 200
+
+        content = json.dumps(
+            {
+                "code": "200",
+                "daily": [
+                    {"fxDate": "2026-01-01", "textDay": "晴", "textNight": "多云", "tempMin": "1", "tempMax": "9"},
+                    {"fxDate": "2026-01-02", "textDay": "雨", "textNight": "雨", "tempMin": "3", "tempMax": "7"},
+                ],
+            }
+        ).encode()
+
+    class _Client:
+        async def get(self, url, params=None):
+            return _Resp()
+
+    tool = WeatherTool()
+    payload = await tool._fetch_payload(_Client(), "forecast", "https://x/v7", {})
+    out = tool._format_action("forecast", payload, "北京")
+    assert out.success is True
+    assert out.output == (
+        "📅 北京 3日天气预报:\n"
+        "- 2026-01-01: 晴转多云, 1~9°C\n"
+        "- 2026-01-02: 雨转雨, 3~7°C"
+    )
+
+
+def test_weather_config_reload_on_change(monkeypatch, tmp_path):
+    monkeypatch.setenv("NANOBOT_HOME", str(tmp_path))
+    cfg = tmp_path / "tool_configs" / "weather_config.json"
+    cfg.parent.mkdir(parents=True)
+    cfg.write_text('{"key": "a"}')
+    tool = WeatherTool()
+    assert tool._load_config() == {"key": "a"}
+    cfg.write_text('{"key": "b"}')
+    st = cfg.stat()
+    os.utime(cfg, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert tool._load_config() == {"key": "b"}
+    cfg.unlink()
+    assert tool._load_config() is None
+
+
+@pytest.mark.asyncio
+async def test_weather_reports_unparseable_response():
+    class _Resp:
+        status_code = 200
+        content = b"<html>gateway error</html>"
+
+    class _Client:
+        async def get(self, url, params=None):
+            return _Resp()
+
+    out = await WeatherTool()._fetch_payload(_Client(), "now", "https://x/v7", {})
+    assert out.success is False
+    assert "解析失败" in out.output
+
+
+@pytest.mark.asyncio
+async def test_weather_geo_cache_prunes_expired_and_caps_entries(monkeypatch, tmp_path):
+    monkeypatch.setenv("NANOBOT_HOME", str(tmp_path))
+    monkeypatch.setattr(weather_mod, "_GEO_CACHE_MAX_ENTRIES", 2)
+    tool = WeatherTool()
+    tool._geo_cache = {"zh:old": {"id": "1", "name": "old", "ts": 0}}
+    await tool._geo_cache_put("a", "zh", ("2", "A"))
+    await tool._geo_cache_put("b", "zh", ("3", "B"))
+    await tool._geo_cache_put("c", "zh", ("4", "C"))
+
+    saved = json.loads((tmp_path / "weather_geocache.json").read_text(encoding="utf-8"))
+    assert sorted(saved) == ["zh:b", "zh:c"]
+    assert [p.name for p in tmp_path.iterdir() if p.suffix == ".tmp"] == []
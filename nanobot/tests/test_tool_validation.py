@@ -86,3 +86,34 @@ async def test_registry_returns_validation_error() -> None:
     reg.register(SampleTool())
     result = await reg.execute("sample", {"query": "hi"})
     assert "Invalid parameters" in result.output
+
+
+def test_registry_metadata_cached_until_registration_changes() -> None:
+    reg = ToolRegistry()
+    reg.register(SampleTool())
+    first = reg.get_all_metadata()
+    assert reg.get_all_metadata() is first
+    reg.unregister("sample")
+    assert reg.get_all_metadata() == []
+
+
+async def test_registry_close_awaits_tool_close_and_isolates_failures() -> None:
+    closed: list[str] = []
+
+    class ClosingTool(SampleTool):
+        async def close(self) -> None:
+            closed.append("sample")
+
+    class BrokenTool(SampleTool):
+        @property
+        def name(self) -> str:
+            return "broken"
+
+        def close(self) -> None:
+            raise RuntimeError("boom")
+
+    reg = ToolRegistry()
+    reg.register(BrokenTool())
+    reg.register(ClosingTool())
+    await reg.close()
+    assert closed == ["sample"]
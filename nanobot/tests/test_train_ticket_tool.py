@@ -22,3 +22,11 @@ def test_train_ticket_train_type_normalize():
     tool = TrainTicketTool()
     assert tool._normalize_train_types("高铁动车") == "GD"
     assert tool._normalize_train_types("gdz") == "GDZ"
+
+
+def test_train_ticket_extract_station_code_prefers_json():
+    tool = TrainTicketTool()
+    text = '{"上海": {"station_code": "SHH", "station_name": "上海"}, "杭州": {"station_code": "HZH"}}'
+    assert tool._extract_station_code(text) == "SHH"
+    assert tool._extract_station_code("station_code: CQW") == "CQW"
+    assert tool._extract_station_code("no code here") is None
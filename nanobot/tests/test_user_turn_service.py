@@ -1,3 +1,4 @@
+import asyncio
 import uuid
 from pathlib import Path
 
@@ -134,3 +135,96 @@ async def test_user_turn_service_adds_partial_execution_note_on_completion_claim
     )
     assert out is not None
     assert "执行说明：" in out.content
+
+
+@pytest.mark.asyncio
+async def test_user_turn_service_overlaps_compaction_when_history_fits(tmp_path):
+    sessions = SessionManager(tmp_path)
+    events: list[str] = []
+
+    async def _compact(session):
+        events.append("compact_start")
+        await asyncio.sleep(0.01)
+        session.messages = [{"role": "system", "content": "summary"}]
+        events.append("compact_end")
+
+    class _RecordingEngine(_FakeTurnEngine):
+        async def run(self, **_kwargs):
+            events.append("turn")
+            return self.content
+
+    service = UserTurnService(
+        sessions=sessions,
+        context=_FakeContext(),
+        tools=_FakeTools(),
+        turn_engine=_RecordingEngine("ok"),
+        compact_history=_compact,
+        filter_reasoning=lambda s: s,
+        is_silent_reply=lambda s: False,
+        history_fits_context=lambda _session: True,
+    )
+    chat_id = f"u-{uuid.uuid4().hex[:8]}"
+    msg = InboundMessage(channel="telegram", sender_id="u", chat_id=chat_id, content="hi", metadata={})
+    await service.process(msg)
+
+    assert events.index("turn") < events.index("compact_end")
+    session = sessions.get_or_create(f"telegram:{chat_id}")
+    assert [m["content"] for m in session.messages] == ["summary", "hi", "ok"]
+
+
+def test_sanitize_drops_ascii_and_fullwidth_colon_headers():
+    service = UserTurnService.__new__(UserTurnService)
+    content = "  查询来源: web\n联网策略 ：auto\n查询来源说明保留\n正文"
+    assert service._sanitize(content, frozenset(), []) == ("查询来源说明保留\n正文", False)
+
+
+def test_sanitize_skips_line_header_checks_without_header_prefix(monkeypatch):
+    import nanobot.agent.user_turn_service as uts
+
+    def _boom(_line):
+        raise AssertionError("per-line header check should be skipped")
+
+    monkeypatch.setattr(uts, "_is_source_header", _boom)
+    service = UserTurnService.__new__(UserTurnService)
+    content = "我查询了天气\n联网后结果如下"
+    assert service._sanitize(content, frozenset(), []) == (content, False)
+
+
+def test_sanitize_drops_headers_and_marks_claims_in_one_pass():
+    service = UserTurnService.__new__(UserTurnService)
+    meta = [{"name": "github", "description": "GitHub 仓库操作工具"}]
+    content = "查询来源: GitHub\n我刚才使用了 GitHub 查了仓库。\n正文"
+    out, detected = service._sanitize(content, frozenset(), meta)
+    assert detected is True
+    assert out.splitlines() == [
+        "~~我刚才使用了 GitHub 查了仓库。~~ [审计：记录中未见 github 相关操作]",
+        "正文",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_user_turn_service_empty_reply_skips_sanitizing(tmp_path):
+    chat_id = f"u-{uuid.uuid4().hex[:8]}"
+    msg = InboundMessage(channel="cli", sender_id="user", chat_id=chat_id, content="hi")
+
+    def _boom(_s):
+        raise AssertionError("filter_reasoning should not run for empty replies")
+
+    sessions = SessionManager(tmp_path)
+
+    async def _compact(_session):
+        return None
+
+    service = UserTurnService(
+        sessions=sessions,
+        context=_FakeContext(),
+        tools=_FakeTools(),
+        turn_engine=_FakeTurnEngine("   ", used_tools=["github"]),
+        compact_history=_compact,
+        filter_reasoning=_boom,
+        is_silent_reply=lambda s: False,
+    )
+    out = await service.process(msg)
+    assert out is not None
+    assert out.content.startswith("本次未产出有效结果")
+    assert [m["role"] for m in sessions.get_or_create(msg.session_key).messages] == ["user", "assistant"]
@@ -18,22 +18,34 @@ def _audit_path() -> Path:
     return data_dir / "audit.log"
 
 
+def _event_line(event: dict[str, Any]) -> str:
+    payload = dict(event)
+    payload.setdefault("ts", datetime.now(timezone.utc).isoformat())
+    if payload.get("type") in {"tool_start", "tool_end"}:
+        payload.setdefault("trace_id", None)
+        payload.setdefault("tool", None)
+        payload.setdefault("tool_call_id", None)
+        payload.setdefault("status", None)
+        payload.setdefault("duration_s", None)
+        payload.setdefault("result_len", None)
+    return json.dumps(payload, ensure_ascii=False) + "\n"
+
+
 def log_event(event: dict[str, Any]) -> None:
     """Append a single JSON event to the audit log with immediate flushing."""
+    log_events([event])
+
+
+def log_events(events: list[dict[str, Any]]) -> None:
+    """Append several JSON events with one write and one fsync."""
     import os
+    if not events:
+        return
     try:
         path = _audit_path()
-        payload = dict(event)
-        payload.setdefault("ts", datetime.now(timezone.utc).isoformat())
-        if payload.get("type") in {"tool_start", "tool_end"}:
-            payload.setdefault("trace_id", None)
-            payload.setdefault("tool", None)
-            payload.setdefault("tool_call_id", None)
-            payload.setdefault("status", None)
-            payload.setdefault("duration_s", None)
-            payload.setdefault("result_len", None)
+        data = "".join(_event_line(event) for event in events)
         with open(path, "a", encoding="utf-8") as f:
-            f.write(json.dumps(payload, ensure_ascii=False) + "\n")
+            f.write(data)
             f.flush()
             os.fsync(f.fileno())
     except Exception as e:
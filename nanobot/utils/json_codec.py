@@ -0,0 +1,44 @@
+"""JSON helpers for hot paths: use orjson when installed, stdlib json otherwise."""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+def dumps_bytes(obj: Any, *, sort_keys: bool = False) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes (no str round-trip when orjson is present)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+        except TypeError:
+            # orjson rejects some inputs stdlib accepts (e.g. non-str keys, huge ints).
+            pass
+    return json.dumps(
+        obj, sort_keys=sort_keys, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def dumps(obj: Any, *, sort_keys: bool = False) -> str:
+    """Serialize to a compact JSON string, non-ASCII characters kept as-is."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0).decode("utf-8")
+        except TypeError:
+            pass
+    return json.dumps(obj, sort_keys=sort_keys, ensure_ascii=False, separators=(",", ":"))
+
+
+def loads(data: str | bytes) -> Any:
+    """Parse JSON from str or bytes. Raises ValueError on malformed input."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)